@@ -0,0 +1,96 @@
+from typing import Dict, List, Tuple
+import altair as alt
+import pandas as pd
+
+from data_grid import prettify_columns
+from metrics import SHOOTING_METRICS, ShootingMetric
+from scoring import SCORING_PERIODS, get_points_column
+
+# Names of the periods in the chart titles
+PERIOD_TITLES: Dict[str, str] = {"auto": "Autonomous", "teleop": "Teleop", "endgame": "Endgame"}
+
+# Metric of the points of every period in the breakdown
+POINTS_METRIC: str = "points"
+
+# Columns of the breakdown a row is identified by
+BREAKDOWN_KEY_COLUMNS: List[str] = ["team.number", "match.number"]
+
+
+def get_team_breakdown(
+    match_data: pd.DataFrame, metrics: List[ShootingMetric] = SHOOTING_METRICS
+) -> pd.DataFrame:
+    """
+    Everything the per-team charts show, aggregated once per selection: the points of every period
+    and every shooting average, averaged over the records of a team in a match when it was
+    scouted more than once.
+
+    Returns:
+        A long-format DataFrame with one row per team, match, period and metric, in the columns
+        `team.number`, `match.number`, `period`, `metric` and `value`. The metric of the points is
+        `POINTS_METRIC`, and the others are shooting locations.
+    """
+    columns: Dict[str, Tuple[str, str]] = {
+        get_points_column(period): (period, POINTS_METRIC) for period in SCORING_PERIODS
+    }
+    columns.update({metric.average: (metric.period, metric.location) for metric in metrics})
+    columns = {column: key for column, key in columns.items() if column in match_data.columns}
+
+    match_data = match_data.dropna(subset=BREAKDOWN_KEY_COLUMNS)
+    wide: pd.DataFrame = (
+        match_data[BREAKDOWN_KEY_COLUMNS + list(columns)]
+        .astype({column: int for column in BREAKDOWN_KEY_COLUMNS})
+        .astype({column: float for column in columns})
+        .groupby(BREAKDOWN_KEY_COLUMNS, sort=True)
+        .mean()
+    )
+    wide.columns = pd.MultiIndex.from_tuples(
+        [columns[column] for column in wide.columns], names=["period", "metric"]
+    )
+    return wide.stack(["period", "metric"], future_stack=True).rename("value").reset_index()
+
+
+def get_points_chart(breakdown: pd.DataFrame) -> alt.FacetChart:
+    """
+    The points of every period of every match, stacked, with one panel per team.
+    """
+    data: pd.DataFrame = prettify_columns(breakdown[breakdown["metric"] == POINTS_METRIC])
+    data["Period"] = data["Period"].map(PERIOD_TITLES)
+    return (
+        alt.Chart(data)
+        .mark_bar()
+        .encode(
+            x=alt.X("Match Number:O"),
+            y=alt.Y("sum(Value):Q", title="Points"),
+            color=alt.Color("Period:N", sort=[PERIOD_TITLES[period] for period in SCORING_PERIODS]),
+            order=alt.Order("Period:N"),
+            tooltip=["Team Number:N", "Match Number:O", "Period:N", "Value:Q"],
+        )
+        .facet(column=alt.Column("Team Number:N"))
+    )
+
+
+def get_period_chart(breakdown: pd.DataFrame, period: str) -> alt.FacetChart:
+    """
+    The shooting averages of a period for every match, with one panel per shooting location and
+    the selected teams side by side in every match.
+    """
+    data: pd.DataFrame = prettify_columns(
+        breakdown[(breakdown["period"] == period) & (breakdown["metric"] != POINTS_METRIC)]
+    )
+    data["Metric"] = data["Metric"].str.capitalize()
+    return (
+        alt.Chart(data)
+        .mark_bar()
+        .encode(
+            x=alt.X("Match Number:O"),
+            y=alt.Y("Value:Q", title="Average", scale=alt.Scale(domain=[0, 1])),
+            color=alt.Color("Team Number:N"),
+            xOffset=alt.XOffset("Team Number:N"),
+            tooltip=["Team Number:N", "Match Number:O", "Value:Q"],
+        )
+        .properties(height=200)
+        .facet(
+            facet=alt.Facet("Metric:N", sort=list(data["Metric"].unique()), title=None),
+            columns=3,
+        )
+    )
@@ -0,0 +1,171 @@
+from typing import List, Optional
+import numpy as np
+import pandas as pd
+
+# Observations of the same robot in the same match are merged into one consensus row
+CONSENSUS_KEY_COLUMNS: List[str] = ["event", "match.number", "team.number"]
+
+# Column with the initials of the scout of every observation
+SCOUT_COLUMN: str = "initials"
+
+# Columns identifying an observation rather than measuring the robot
+CONSENSUS_EXCLUDED_COLUMNS: List[str] = ["team.number", "match.number", "season"]
+
+# Observations of a robot are disputed when the ranges of their counters and flags add up to
+# more than this, e.g. two scouts counting 3 notes apart
+DISAGREEMENT_THRESHOLD: float = 3.0
+
+# Columns added to the consensus rows
+SCOUTS_COLUMN: str = "consensus.scouts"
+SPREAD_COLUMN: str = "consensus.spread"
+DISPUTED_COLUMN: str = "consensus.disputed"
+
+
+def get_consensus_columns(match_data: pd.DataFrame) -> List[str]:
+    """
+    Counters and flags of the match data, which are merged with a weighted median. Every other
+    column comes from the observation of the most reliable scout.
+    """
+    return [
+        column
+        for column, dtype in match_data.dtypes.items()
+        if column not in CONSENSUS_EXCLUDED_COLUMNS
+        and not isinstance(dtype, pd.CategoricalDtype)
+        and dtype.kind in "iub"
+    ]
+
+
+def _get_groups(match_data: pd.DataFrame) -> np.ndarray:
+    """
+    Group of every observation, by (event, match.number, team.number). Observations missing a
+    key are never merged, so they each get a group of their own.
+    """
+    keys: pd.DataFrame = match_data.reindex(columns=CONSENSUS_KEY_COLUMNS)
+    by: List[pd.Series] = [keys[column].astype(object) for column in CONSENSUS_KEY_COLUMNS]
+    groups: np.ndarray = keys.groupby(by, dropna=False).ngroup().to_numpy(dtype=np.int64)
+    missing: np.ndarray = keys.isna().any(axis=1).to_numpy()
+    groups[missing] = groups.max(initial=-1) + 1 + np.arange(missing.sum())
+    return groups
+
+
+def _get_values(match_data: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    return match_data.reindex(columns=columns).astype(np.float64).to_numpy(na_value=np.nan)
+
+
+def _group_median(
+    groups: np.ndarray, values: np.ndarray, weights: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Weighted (lower) median of every column within every group, as a (groups, columns) array.
+    The median is always one of the observed values, and NaN when a group has none.
+    """
+    group_count: int = int(groups.max(initial=-1)) + 1
+    weights = np.ones(len(groups)) if weights is None else weights
+    medians: np.ndarray = np.full((group_count, values.shape[1]), np.nan)
+    if not len(groups):
+        return medians
+
+    for column in range(values.shape[1]):
+        column_values: np.ndarray = values[:, column]
+        order: np.ndarray = np.lexsort((np.nan_to_num(column_values, nan=np.inf), groups))
+        sorted_groups: np.ndarray = groups[order]
+        sorted_weights: np.ndarray = np.where(np.isnan(column_values), 0, weights)[order]
+
+        starts: np.ndarray = np.flatnonzero(np.diff(sorted_groups, prepend=-1))
+        sizes: np.ndarray = np.diff(np.append(starts, len(order)))
+        cumulative: np.ndarray = np.cumsum(sorted_weights)
+        before: np.ndarray = np.repeat(cumulative[starts] - sorted_weights[starts], sizes)
+        totals: np.ndarray = np.add.reduceat(sorted_weights, starts)
+        reached: np.ndarray = cumulative - before >= np.repeat(totals, sizes) / 2
+
+        # First observation of every group reaching half of the weight of the group
+        first: np.ndarray = np.minimum.reduceat(
+            np.where(reached, np.arange(len(order)), len(order)), starts
+        )
+        medians[sorted_groups[starts], column] = column_values[order[first]]
+    return medians
+
+
+def compute_scout_weights(match_data: pd.DataFrame) -> pd.Series:
+    """
+    Reliability of every scout, from how far their observations were from the mean of every
+    observation of the same robot in the same match: `1 / (1 + mean distance)`, where the
+    distance is the sum of the differences over every counter and flag. Scouts never checked
+    against another scout get the median reliability.
+    """
+    columns: List[str] = get_consensus_columns(match_data)
+    groups: np.ndarray = _get_groups(match_data)
+    values: np.ndarray = _get_values(match_data, columns)
+
+    sizes: np.ndarray = np.bincount(groups)
+    checked: np.ndarray = sizes[groups] > 1
+    present: np.ndarray = ~np.isnan(values)
+    counts: np.ndarray = np.zeros((len(sizes), len(columns)))
+    totals: np.ndarray = np.zeros_like(counts)
+    np.add.at(counts, groups, present)
+    np.add.at(totals, groups, np.where(present, values, 0))
+    means: np.ndarray = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+    distances: np.ndarray = np.nansum(np.abs(values - means[groups]), axis=1)
+
+    scouts: pd.Series = match_data[SCOUT_COLUMN].astype("string").fillna("")
+    mean_distances: pd.Series = (
+        pd.Series(distances[checked]).groupby(scouts[checked].to_numpy()).mean()
+    )
+    weights: pd.Series = 1 / (1 + mean_distances)
+    default: float = float(weights.median()) if len(weights) else 1.0
+    return weights.reindex(scouts.unique()).fillna(default).rename("weight")
+
+
+def build_consensus(
+    match_data: pd.DataFrame, scout_weights: Optional[pd.Series] = None
+) -> pd.DataFrame:
+    """
+    Merge the observations of the same robot in the same match by different scouts into one
+    consensus row, in a single pass over every group.
+
+    Counters and flags are the median of the observations, weighted by the reliability of their
+    scouts (see `compute_scout_weights`). Every other column, e.g. the end location, comes from
+    the observation of the most reliable scout. Derived metrics are not merged, so add them
+    again afterwards.
+
+    Returns:
+        One row per robot and match, with the number of observations in `SCOUTS_COLUMN`, the sum
+        of the ranges of the counters and flags in `SPREAD_COLUMN`, and whether that exceeds
+        `DISAGREEMENT_THRESHOLD` in `DISPUTED_COLUMN`.
+    """
+    if scout_weights is None:
+        scout_weights = compute_scout_weights(match_data)
+    columns: List[str] = get_consensus_columns(match_data)
+    groups: np.ndarray = _get_groups(match_data)
+    values: np.ndarray = _get_values(match_data, columns)
+
+    scouts: pd.Series = match_data[SCOUT_COLUMN].astype("string").fillna("")
+    weights: np.ndarray = (
+        scout_weights.reindex(scouts.to_numpy()).fillna(1.0).to_numpy(dtype=np.float64)
+    )
+
+    # The observation of the most reliable scout of every group, the first one on ties
+    order: np.ndarray = np.lexsort((-weights, groups))
+    starts: np.ndarray = np.flatnonzero(np.diff(groups[order], prepend=-1))
+    representatives: np.ndarray = order[starts]
+
+    consensus: pd.DataFrame = match_data.iloc[representatives].reset_index(drop=True)
+    medians: np.ndarray = _group_median(groups, values, weights)[groups[representatives]]
+    for position, column in enumerate(columns):
+        consensus[column] = pd.Series(medians[:, position]).astype(match_data[column].dtype)
+
+    sorted_values: np.ndarray = values[order]
+    spread: np.ndarray = np.zeros(len(starts))
+    if len(order):
+        ranges: np.ndarray = np.fmax.reduceat(sorted_values, starts) - np.fmin.reduceat(
+            sorted_values, starts
+        )
+        spread = np.nansum(ranges, axis=1)
+    consensus[SCOUTS_COLUMN] = pd.array(np.diff(np.append(starts, len(order))), dtype="UInt8")
+    consensus[SPREAD_COLUMN] = spread
+    consensus[DISPUTED_COLUMN] = spread > DISAGREEMENT_THRESHOLD
+
+    sort_columns: List[str] = [
+        column for column in CONSENSUS_KEY_COLUMNS if column in consensus.columns
+    ]
+    return consensus.sort_values(by=sort_columns).reset_index(drop=True)
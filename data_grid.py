@@ -0,0 +1,233 @@
+import functools
+import json
+import math
+from typing import Callable, List, Optional, Tuple, Union
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import streamlit as st
+
+from st_aggrid import AgGrid, GridOptionsBuilder
+from st_aggrid.shared import ExcelExportMode
+
+from schema import to_pandas
+
+# How timestamps are shown in the grids
+TIMESTAMP_FORMAT: str = "%Y-%m-%dT%H:%M:%S"
+
+# Rows per page the paged grids can show. Only the rows of the current page are sent to the
+# browser.
+PAGE_SIZES: List[int] = [10, 25, 50, 100]
+
+
+def search_table(table: pa.Table, search: str) -> pa.Table:
+    """
+    Rows with a text column containing `search` (ignoring case), or an integer column equal to it
+    when it is a number. Every row when `search` is empty.
+    """
+    search = search.strip()
+    if not search:
+        return table
+
+    matches: Optional[pa.ChunkedArray] = None
+    for field in table.schema:
+        column = table.column(field.name)
+        if pa.types.is_dictionary(field.type):
+            column = column.cast(pa.string())
+            column_type = pa.string()
+        else:
+            column_type = field.type
+
+        if pa.types.is_string(column_type):
+            column_matches = pc.match_substring(column, search, ignore_case=True)
+        elif pa.types.is_integer(column_type) and search.isdigit():
+            column_matches = pc.equal(column, int(search))
+        else:
+            continue
+        column_matches = pc.fill_null(column_matches, False)
+        matches = column_matches if matches is None else pc.or_(matches, column_matches)
+
+    return table.slice(0, 0) if matches is None else table.filter(matches)
+
+
+def get_table_page(
+    table: pa.Table,
+    page: int,
+    page_size: int,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+) -> pa.Table:
+    """
+    Rows of a page (starting at 1) of the table, sorted by `sort_by` when given. Only the indices
+    are sorted, and only the rows of the page are taken from the table.
+    """
+    start: int = (page - 1) * page_size
+    if not sort_by:
+        return table.slice(start, page_size)
+
+    # Arrow cannot sort dictionary encoded columns, so sort their values instead
+    sort_column: pa.ChunkedArray = table.column(sort_by)
+    if pa.types.is_dictionary(sort_column.type):
+        sort_column = sort_column.cast(sort_column.type.value_type)
+    indices: pa.Array = pc.sort_indices(
+        pa.table({sort_by: sort_column}),
+        sort_keys=[(sort_by, "descending" if descending else "ascending")],
+        null_placement="at_end",
+    )
+    return table.take(indices.slice(start, page_size))
+
+
+def _get_schema_fingerprint(data: pd.DataFrame) -> Tuple[Tuple[str, str], ...]:
+    return tuple((str(column), str(dtype)) for column, dtype in data.dtypes.items())
+
+
+@functools.lru_cache(maxsize=64)
+def get_grid_options(
+    fingerprint: Tuple[Tuple[str, str], ...],
+    page_size: Optional[int] = 10,
+    auto_page_size: bool = False,
+) -> str:
+    """
+    Grid options for every DataFrame with the given columns and dtypes (see
+    `_get_schema_fingerprint`), built once per schema instead of on every rerun.
+
+    The options are kept as JSON, which AgGrid parses into new options on every call, so the
+    cached options are never modified by AgGrid.
+    """
+    data_grid = GridOptionsBuilder.from_dataframe(
+        pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in fingerprint})
+    )
+    if auto_page_size:
+        data_grid.configure_pagination(enabled=True, paginationAutoPageSize=True)
+    elif page_size:
+        data_grid.configure_pagination(enabled=True, paginationPageSize=page_size)
+    data_grid.configure_default_column(groupable="true", filterable="true")
+    data_grid.configure_grid_options(alwaysShowHorizontalScroll=True)
+    data_grid.configure_side_bar(filters_panel=True)
+    return json.dumps(data_grid.build())
+
+
+@functools.lru_cache(maxsize=None)
+def get_pretty_column_name(column: str) -> str:
+    """
+    Column name for people, e.g. `amp.auto.average` becomes `Amp Auto Average`.
+    """
+    return " ".join([word.capitalize() for word in column.split(".")])
+
+
+def prettify_columns(data: pd.DataFrame) -> pd.DataFrame:
+    return data.rename(columns=get_pretty_column_name)
+
+
+def _to_grid_data(data: Union[pd.DataFrame, pa.Table]) -> pd.DataFrame:
+    """
+    Convert the data to the DataFrame AgGrid serializes, with timestamps already formatted as ISO
+    8601 strings by Arrow. AgGrid would otherwise format them one cell at a time in Python.
+    """
+    if isinstance(data, pa.Table):
+        columns: List[pa.ChunkedArray] = [
+            pc.strftime(column, TIMESTAMP_FORMAT) if pa.types.is_timestamp(column.type) else column
+            for column in data.columns
+        ]
+        return to_pandas(pa.Table.from_arrays(columns, names=data.column_names))
+
+    data = data.copy(deep=False)
+    for column, dtype in data.dtypes.items():
+        if dtype.kind == "M":
+            timestamps: pa.Array = pa.Array.from_pandas(data[column])
+            data[column] = pc.strftime(timestamps, TIMESTAMP_FORMAT).to_pandas()
+    return data
+
+
+def render_grid(
+    data: Union[pd.DataFrame, pa.Table],
+    page_size: Optional[int] = 10,
+    auto_page_size: bool = False,
+    excel_export: bool = True,
+) -> None:
+    """
+    Show a DataFrame or an Arrow table in an AgGrid with the filters side bar and, unless
+    disabled, Excel export.
+
+    Args:
+        page_size: Rows per page of the grid, or None to show every row.
+        auto_page_size: Fit as many rows per page as the height of the grid allows.
+    """
+    data = _to_grid_data(data)
+    AgGrid(
+        data,
+        gridOptions=get_grid_options(_get_schema_fingerprint(data), page_size, auto_page_size),
+        excel_export_mode=ExcelExportMode.MANUAL if excel_export else ExcelExportMode.NONE,
+        allow_unsafe_jscode=True,
+        custom_css={
+            "#gridToolBar": {
+                "padding-bottom": "0px !important",
+            }
+        },
+    )
+
+
+def render_paged_grid(
+    table: pa.Table,
+    key: str,
+    transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+    pretty_columns: bool = False,
+) -> None:
+    """
+    Show a table in an AgGrid one page at a time. Searching, sorting and paging happen on the
+    server against the Arrow table, so the browser only ever receives the rows of the current
+    page, however large the table is. Only the columns of the table can be searched and sorted
+    by, so add derived columns to the table rather than in `transform`.
+
+    Args:
+        key: Unique prefix for the keys of the paging widgets.
+        transform: Applied to the rows of the page before showing them.
+        pretty_columns: Show the columns, and the columns to sort by, with their names for
+            people (see `get_pretty_column_name`).
+    """
+    column1, column2, column3, column4, column5 = st.columns([3, 3, 1, 1, 1])
+
+    with column1:
+        search: str = st.text_input(label="Search", key=f"{key}.search")
+    with column2:
+        sort_by: Optional[str] = st.selectbox(
+            label="Sort by",
+            options=table.column_names,
+            index=None,
+            format_func=get_pretty_column_name if pretty_columns else str,
+            key=f"{key}.sort_by",
+        )
+    with column3:
+        descending: bool = st.toggle(label="Descending", key=f"{key}.descending")
+    with column4:
+        page_size: int = st.selectbox(label="Rows", options=PAGE_SIZES, key=f"{key}.page_size")
+
+    matches: pa.Table = search_table(table, search)
+    page_count: int = max(math.ceil(matches.num_rows / page_size), 1)
+
+    # The number of pages shrinks when searching, so keep the current page in range
+    page_key: str = f"{key}.page"
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = page_count
+    with column5:
+        page: int = st.number_input(
+            label=f"Page (of {page_count})",
+            min_value=1,
+            max_value=page_count,
+            step=1,
+            key=page_key,
+        )
+
+    page_table: pa.Table = get_table_page(matches, page, page_size, sort_by, descending)
+    data: Union[pd.DataFrame, pa.Table] = (
+        page_table if transform is None else transform(to_pandas(page_table))
+    )
+    if pretty_columns:
+        data = (
+            prettify_columns(data)
+            if isinstance(data, pd.DataFrame)
+            else data.rename_columns([get_pretty_column_name(name) for name in data.column_names])
+        )
+
+    st.caption(f"{matches.num_rows} of {table.num_rows} rows")
+    render_grid(data, page_size=None)
@@ -0,0 +1,610 @@
+import logging
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import streamlit as st
+
+from watchdog.events import (
+    EVENT_TYPE_CREATED,
+    EVENT_TYPE_DELETED,
+    EVENT_TYPE_MODIFIED,
+    EVENT_TYPE_MOVED,
+    FileSystemEvent,
+    FileSystemEventHandler,
+)
+from watchdog.observers import Observer
+
+import etl
+from consensus import build_consensus
+from match_index import MatchIndex
+from note_search import NOTE_COLUMNS, NOTE_KEY_COLUMNS, NoteIndex, collect_notes
+from opr import OprSolver, get_opr_components
+from pit_options import build_option_matrix, explode_list_columns
+from query_data import (
+    SCOUTING_KINDS,
+    build_scouting_predicate,
+    get_events_available,
+    get_filtered_path,
+    load_tba_oprs,
+    rank_tba_oprs,
+    query_scouting_table,
+)
+from rollups import ROLLUP_STATISTICS, TeamRollup, get_rollup_columns
+from schema import to_pandas
+from seasons import CURRENT_SEASON, SEASONS, add_derived_metrics
+from team_history import TeamHistory
+
+logger = logging.getLogger(__name__)
+
+# Folders watched for new exports and OPR dumps
+WATCHED_PATHS: List[str] = ["data", "tba_oprs"]
+
+# Events of the watched files that change their contents. Reading a file (opening and closing
+# it) must not trigger a refresh, since every refresh reads the files again.
+CHANGE_EVENT_TYPES: List[str] = [
+    EVENT_TYPE_CREATED,
+    EVENT_TYPE_MODIFIED,
+    EVENT_TYPE_MOVED,
+    EVENT_TYPE_DELETED,
+]
+
+# Exports are usually copied over in bursts, so wait for things to settle before refreshing
+REFRESH_DELAY_SECONDS: float = 1.0
+
+
+class ScoutingSnapshot(NamedTuple):
+    """
+    Everything the data store serves, loaded at once by `ScoutingDataStore.refresh`. A snapshot
+    is never modified, so queries made on the same snapshot always agree with each other.
+    """
+
+    # Scouting data of every kind, as loaded from the filtered store
+    tables: Dict[str, pa.Table]
+    match_index: MatchIndex
+    # One consensus row per robot and match (see `consensus`), which every statistic uses
+    consensus_index: MatchIndex
+    # Multiple choice answers of the pit data, parsed once (see `pit_options`)
+    pit_lists: pd.DataFrame
+    pit_options: pd.DataFrame
+    note_index: NoteIndex
+    # TBA OPRs of every event, by statistic (see `get_tba_opr_data`)
+    tba_oprs: Dict[str, pd.DataFrame]
+    scouting_oprs: Dict[str, pd.DataFrame]
+    # Statistics of every team at every event, by event then statistic (see `rollups`)
+    team_rollups: Dict[str, Dict[str, pd.DataFrame]]
+    team_history: TeamHistory
+    # Increases every time the data is refreshed
+    version: int
+
+    def get_events(self) -> List[str]:
+        return [event for event in self.match_index.events.tolist() if event]
+
+    def get_teams(self, event: str) -> List[int]:
+        """
+        Team numbers with match scouting data at the event, in increasing order.
+        """
+        return self.match_index.get_teams(event)
+
+    def get_matches(self, event: str, team: Optional[int] = None) -> List[int]:
+        """
+        Match numbers with scouting data at the event (for a single team, if given).
+        """
+        return self.match_index.get_matches(event, team)
+
+    def query_match_scouting(
+        self,
+        events: Optional[List[str]] = None,
+        teams: Optional[List[int]] = None,
+        matches: Optional[List[int]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Same as `query_data.query_match_scouting`, served from memory and sorted by
+        (event, team.number, match.number). The selection is sliced out of the sorted match
+        index, so its cost scales with the size of the selection.
+        """
+        return to_pandas(self.query_match_table(events, teams, matches, columns))
+
+    def query_match_table(
+        self,
+        events: Optional[List[str]] = None,
+        teams: Optional[List[int]] = None,
+        matches: Optional[List[int]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pa.Table:
+        """
+        Same as `query_match_scouting`, as an Arrow table, for callers that only convert part of
+        the selection (e.g. a page of a grid).
+        """
+        table: pa.Table = self.match_index.select(events, teams, matches)
+        if columns:
+            table = table.select([column for column in columns if column in table.schema.names])
+        return table
+
+    def query_match_consensus(
+        self,
+        events: Optional[List[str]] = None,
+        teams: Optional[List[int]] = None,
+        matches: Optional[List[int]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Same as `query_match_scouting`, with the observations of the same robot in the same match
+        by different scouts merged into one row (see `consensus.build_consensus`), and the
+        derived metrics already added.
+        """
+        table: pa.Table = self.consensus_index.select(events, teams, matches)
+        if columns:
+            table = table.select([column for column in columns if column in table.schema.names])
+        return to_pandas(table)
+
+    def query_pit_scouting(
+        self,
+        events: Optional[List[str]] = None,
+        teams: Optional[List[int]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Same as `query_data.query_pit_scouting`, served from memory.
+        """
+        return self._query("pit", events, teams, columns)
+
+    def search_notes(
+        self,
+        search: str,
+        kinds: Optional[List[str]] = None,
+        events: Optional[List[str]] = None,
+        teams: Optional[List[int]] = None,
+        top_k: int = 100,
+    ) -> pd.DataFrame:
+        """
+        Notes of the scouters matching a search, best first (see `note_search.NoteIndex.search`).
+        """
+        return self.note_index.search(search, kinds, events, teams, top_k)
+
+    def query_pit_lists(
+        self, events: Optional[List[str]] = None, teams: Optional[List[int]] = None
+    ) -> pd.DataFrame:
+        """
+        Multiple choice answers of the pit data, one row per answer (see
+        `pit_options.explode_list_columns`). `row` is the position of the answer's record in
+        `query_pit_scouting()`.
+        """
+        lists: pd.DataFrame = self.pit_lists
+        return lists[_select_keys(lists["event"], lists["team.number"], events, teams)].copy()
+
+    def query_pit_options(
+        self, events: Optional[List[str]] = None, teams: Optional[List[int]] = None
+    ) -> pd.DataFrame:
+        """
+        Multi-hot matrix of the multiple choice answers of the pit data (see
+        `pit_options.build_option_matrix`), with its rows in the order of `query_pit_scouting`.
+        """
+        options: pd.DataFrame = self.pit_options
+        keys: pd.MultiIndex = options.index
+        return options[
+            _select_keys(
+                keys.get_level_values("event"), keys.get_level_values("team.number"), events, teams
+            )
+        ].copy()
+
+    def get_tba_opr_options(self) -> List[str]:
+        return [
+            event.capitalize()
+            for event in self.tba_oprs["value"].index.unique(level="event").tolist()
+        ]
+
+    def get_tba_opr_data(self, event: str, statistic: str = "value") -> pd.DataFrame:
+        """
+        The TBA OPRs of every team at the event, with the team number in `Team Number`.
+
+        Args:
+            statistic: "value" for the OPRs themselves, "rank" for the rank of every team at the
+                event, or "percentile" for their percentile at the event.
+        """
+        oprs: pd.DataFrame = self.tba_oprs[statistic]
+        if event.lower() not in oprs.index.unique(level="event"):
+            raise Exception("Path does not exist for that event.")
+        return oprs.xs(event.lower(), level="event").rename_axis("Team Number").reset_index()
+
+    def get_tba_team_oprs(self, team: int, statistic: str = "value") -> pd.DataFrame:
+        """
+        The TBA OPRs of a team at every event it played, with the event in `event`.
+        """
+        oprs: pd.DataFrame = self.tba_oprs[statistic]
+        if team not in oprs.index.unique(level="team.number"):
+            return oprs.iloc[:0].reset_index(level="team.number", drop=True).reset_index()
+        return oprs.xs(team, level="team.number").reset_index()
+
+    def get_scouting_opr_data(self, event: str) -> pd.DataFrame:
+        """
+        OPR and COPRs of every team at the event, computed from the scouting data. One column per
+        component, with the team numbers in `team.number`.
+        """
+        return self.scouting_oprs[event].reset_index()
+
+    def get_team_rollup(self, event: str, statistic: str = "mean") -> pd.DataFrame:
+        """
+        A statistic (see `rollups.ROLLUP_STATISTICS`) of every counter and derived metric of
+        every team at the event, one row per team indexed by team number. Rolled up when the
+        data is refreshed, so reading it never touches the scouted rows.
+        """
+        if statistic not in ROLLUP_STATISTICS:
+            raise ValueError(f"Unknown statistic {statistic}, expected one of {ROLLUP_STATISTICS}")
+        rollups: Optional[Dict[str, pd.DataFrame]] = self.team_rollups.get(event)
+        if rollups is None:
+            return pd.DataFrame(index=pd.Index([], name="team.number"))
+        return rollups[statistic].copy()
+
+    def get_team_history(self, team: int) -> pd.DataFrame:
+        """
+        Every scouted match of a team across every event, in the order they were played, with
+        rolling averages and trends (see `team_history.TeamHistory.get_team_history`).
+        """
+        return self.team_history.get_team_history(team).copy()
+
+    def get_team_form(self) -> pd.DataFrame:
+        """
+        Rolling averages and trends of every team as of its last scouted match of the season
+        (see `team_history.TeamHistory.get_form`).
+        """
+        return self.team_history.get_form().copy()
+
+    def _query(
+        self,
+        kind: str,
+        events: Optional[List[str]],
+        teams: Optional[List[int]],
+        columns: Optional[List[str]],
+    ) -> pd.DataFrame:
+        table: pa.Table = self.tables[kind]
+
+        predicate = build_scouting_predicate(teams)
+        if events is not None:
+            event_predicate = ds.field("event").isin(events)
+            predicate = event_predicate if predicate is None else predicate & event_predicate
+        if predicate is not None:
+            table = table.filter(predicate)
+        if columns:
+            table = table.select([column for column in columns if column in table.schema.names])
+
+        return to_pandas(table)
+
+
+class ScoutingDataStore:
+    """
+    Process-wide, read-only snapshot of the scouting data, shared by every session.
+
+    The scouting data is kept as immutable Arrow tables and every query returns a new DataFrame,
+    so sessions can never modify the shared data. Refreshing builds a new `ScoutingSnapshot` and
+    swaps it in with a single assignment, and every query reads the snapshot once, so readers
+    never see a half-loaded store.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ScoutingSnapshot] = None
+        self._opr_solvers: Dict[str, OprSolver] = {}
+        self._rollups: Dict[str, TeamRollup] = {}
+        self._opr_lock = threading.Lock()
+        # Events whose raw exports could not be turned into a filtered store (see
+        # `_update_filtered_store`), which are served from their last filtered store, if any
+        self._failed_events: List[str] = []
+        self._observer: Optional[Observer] = None
+        self._refresh_timer: Optional[threading.Timer] = None
+
+        self._update_filtered_store(get_events_available())
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Reload every event and OPR dump from disk.
+        """
+        tables: Dict[str, pa.Table] = {
+            kind: query_scouting_table(kind, events=self._get_loadable_events(kind))
+            for kind in SCOUTING_KINDS
+        }
+        # Events read from their raw exports have no derived metrics yet, and every row needs
+        # them to be searched and sorted by (see `data_grid.render_paged_grid`)
+        tables["match"] = pa.Table.from_pandas(
+            add_derived_metrics(to_pandas(tables["match"])), preserve_index=False
+        )
+        match_index = MatchIndex(tables["match"])
+        pit_data: pd.DataFrame = to_pandas(tables["pit"])
+        pit_lists: pd.DataFrame = explode_list_columns(pit_data)
+        pit_options: pd.DataFrame = build_option_matrix(pit_lists, pit_data)
+        note_index = NoteIndex(
+            collect_notes(
+                {
+                    "match": to_pandas(
+                        tables["match"].select(
+                            [
+                                column
+                                for column in [*NOTE_KEY_COLUMNS, NOTE_COLUMNS["match"]]
+                                if column in tables["match"].schema.names
+                            ]
+                        )
+                    ),
+                    "pit": pit_data,
+                }
+            )
+        )
+        # The TBA OPRs of every event, then their ranks and percentiles within the event
+        tba_oprs: pd.DataFrame = load_tba_oprs()
+        tba_opr_ranks, tba_opr_percentiles = rank_tba_oprs(tba_oprs)
+        consensus_data: pd.DataFrame = add_derived_metrics(
+            build_consensus(to_pandas(match_index.table))
+        )
+        consensus_index = MatchIndex(pa.Table.from_pandas(consensus_data, preserve_index=False))
+        scouting_oprs, team_rollups = self._update_event_statistics(consensus_index)
+        team_history = TeamHistory(consensus_data)
+        with self._lock:
+            self._snapshot = ScoutingSnapshot(
+                tables=tables,
+                match_index=match_index,
+                consensus_index=consensus_index,
+                pit_lists=pit_lists,
+                pit_options=pit_options,
+                note_index=note_index,
+                tba_oprs={
+                    "value": tba_oprs,
+                    "rank": tba_opr_ranks,
+                    "percentile": tba_opr_percentiles,
+                },
+                scouting_oprs=scouting_oprs,
+                team_rollups=team_rollups,
+                team_history=team_history,
+                version=self.version + 1,
+            )
+
+    @property
+    def version(self) -> int:
+        """
+        Version of the current snapshot, which increases every time the data is refreshed.
+        """
+        return self._snapshot.version if self._snapshot is not None else 0
+
+    def get_snapshot(self) -> ScoutingSnapshot:
+        """
+        The current snapshot of the data. Queries that are combined with each other (e.g. lined
+        up by position) must all be made on the same snapshot, since the store can be refreshed
+        between two of its own queries.
+        """
+        return self._snapshot
+
+    # Every query below is served by the current snapshot, see `ScoutingSnapshot`
+    def get_events(self) -> List[str]:
+        return self._snapshot.get_events()
+
+    def get_teams(self, event: str) -> List[int]:
+        return self._snapshot.get_teams(event)
+
+    def get_matches(self, event: str, team: Optional[int] = None) -> List[int]:
+        return self._snapshot.get_matches(event, team)
+
+    def query_match_scouting(
+        self,
+        events: Optional[List[str]] = None,
+        teams: Optional[List[int]] = None,
+        matches: Optional[List[int]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        return self._snapshot.query_match_scouting(events, teams, matches, columns)
+
+    def query_match_table(
+        self,
+        events: Optional[List[str]] = None,
+        teams: Optional[List[int]] = None,
+        matches: Optional[List[int]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pa.Table:
+        return self._snapshot.query_match_table(events, teams, matches, columns)
+
+    def query_match_consensus(
+        self,
+        events: Optional[List[str]] = None,
+        teams: Optional[List[int]] = None,
+        matches: Optional[List[int]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        return self._snapshot.query_match_consensus(events, teams, matches, columns)
+
+    def query_pit_scouting(
+        self,
+        events: Optional[List[str]] = None,
+        teams: Optional[List[int]] = None,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        return self._snapshot.query_pit_scouting(events, teams, columns)
+
+    def search_notes(
+        self,
+        search: str,
+        kinds: Optional[List[str]] = None,
+        events: Optional[List[str]] = None,
+        teams: Optional[List[int]] = None,
+        top_k: int = 100,
+    ) -> pd.DataFrame:
+        return self._snapshot.search_notes(search, kinds, events, teams, top_k)
+
+    def query_pit_lists(
+        self, events: Optional[List[str]] = None, teams: Optional[List[int]] = None
+    ) -> pd.DataFrame:
+        return self._snapshot.query_pit_lists(events, teams)
+
+    def query_pit_options(
+        self, events: Optional[List[str]] = None, teams: Optional[List[int]] = None
+    ) -> pd.DataFrame:
+        return self._snapshot.query_pit_options(events, teams)
+
+    def get_tba_opr_options(self) -> List[str]:
+        return self._snapshot.get_tba_opr_options()
+
+    def get_tba_opr_data(self, event: str, statistic: str = "value") -> pd.DataFrame:
+        return self._snapshot.get_tba_opr_data(event, statistic)
+
+    def get_tba_team_oprs(self, team: int, statistic: str = "value") -> pd.DataFrame:
+        return self._snapshot.get_tba_team_oprs(team, statistic)
+
+    def get_scouting_opr_data(self, event: str) -> pd.DataFrame:
+        return self._snapshot.get_scouting_opr_data(event)
+
+    def get_team_rollup(self, event: str, statistic: str = "mean") -> pd.DataFrame:
+        return self._snapshot.get_team_rollup(event, statistic)
+
+    def get_team_history(self, team: int) -> pd.DataFrame:
+        return self._snapshot.get_team_history(team)
+
+    def get_team_form(self) -> pd.DataFrame:
+        return self._snapshot.get_team_form()
+
+    def _update_event_statistics(
+        self, match_index: MatchIndex
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Dict[str, pd.DataFrame]]]:
+        """
+        Feed the consensus match data of every event to its OPR solver and its team rollup, which
+        only ingest the alliances and rows that changed since the last refresh.
+
+        Returns:
+            The OPRs of every event, and every statistic of the team rollup of every event.
+        """
+        oprs: Dict[str, pd.DataFrame] = {}
+        rollups: Dict[str, Dict[str, pd.DataFrame]] = {}
+        with self._opr_lock:
+            for event in [event for event in match_index.events.tolist() if event]:
+                match_data: pd.DataFrame = to_pandas(match_index.select(events=[event]))
+                if event not in self._opr_solvers:
+                    season: int = int(match_data["season"].fillna(CURRENT_SEASON).iloc[0])
+                    self._opr_solvers[event] = OprSolver(get_opr_components(SEASONS[season]))
+                self._opr_solvers[event].update(match_data)
+                oprs[event] = self._opr_solvers[event].solve()
+
+                # A season's columns never change, but start over if an export brings new ones
+                columns: List[str] = get_rollup_columns(match_data)
+                if event not in self._rollups or self._rollups[event].columns != columns:
+                    self._rollups[event] = TeamRollup(columns)
+                self._rollups[event].update(match_data)
+                rollups[event] = {
+                    statistic: self._rollups[event].get_statistic(statistic)
+                    for statistic in ROLLUP_STATISTICS
+                }
+        return oprs, rollups
+
+    def watch(self) -> None:
+        """
+        Start refreshing the store whenever a raw export or an OPR dump changes on disk.
+        """
+        if self._observer is not None:
+            return
+
+        handler = _WatchedFileHandler(self)
+        self._observer = Observer()
+        for path in WATCHED_PATHS:
+            if os.path.isdir(path):
+                self._observer.schedule(handler, path, recursive=True)
+        self._observer.daemon = True
+        self._observer.start()
+
+    def _schedule_refresh(self) -> None:
+        with self._lock:
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+            self._refresh_timer = threading.Timer(REFRESH_DELAY_SECONDS, self._refresh_from_disk)
+            self._refresh_timer.daemon = True
+            self._refresh_timer.start()
+
+    def _refresh_from_disk(self) -> None:
+        # A file caught in the middle of being copied will trigger another refresh once it is
+        # complete, so keep serving the current snapshot until then
+        try:
+            # An export can duplicate one from another event, so every event is checked. The ETL
+            # only rebuilds the events that actually changed.
+            self._update_filtered_store(get_events_available())
+            self.refresh()
+        except Exception:
+            logger.exception("Could not refresh the scouting data, keeping the current snapshot")
+
+    def _update_filtered_store(self, events: List[str]) -> None:
+        """
+        Bring the filtered store of the given events up to date. The ETL is incremental, so this
+        is nearly free when nothing changed. Without a writable checkout, the events are read
+        from their raw exports instead. Events with an export that cannot be parsed are logged
+        and left out of `refresh` until the export is fixed.
+        """
+        failed_events: List[str] = []
+        duplicates: Dict[str, Dict[str, str]] = etl.find_duplicates()
+        for event in events:
+            try:
+                etl.run_event(event, duplicates=duplicates)
+            except OSError:
+                pass
+            except (pa.ArrowInvalid, ValueError):
+                # A malformed export only takes its own event down, not the whole store
+                logger.exception("Could not update the filtered store of %s, skipping it", event)
+                failed_events.append(event)
+        self._failed_events = failed_events
+
+    def _get_loadable_events(self, kind: str) -> List[str]:
+        """
+        Every event, except the events the ETL failed on that have no filtered store to fall back
+        to, since reading their raw exports would fail the same way.
+        """
+        return [
+            event
+            for event in get_events_available()
+            if event not in self._failed_events or os.path.exists(get_filtered_path(event, kind))
+        ]
+
+
+def _select_keys(
+    event_values: pd.Index,
+    team_values: pd.Index,
+    events: Optional[List[str]],
+    teams: Optional[List[int]],
+) -> np.ndarray:
+    """
+    Mask of the rows of the given events and teams, with None (or no teams) keeping every row,
+    like `_query`.
+    """
+    mask = np.ones(len(event_values), dtype=bool)
+    if events is not None:
+        mask &= np.asarray(pd.Index(event_values).isin(events))
+    if teams:
+        mask &= np.asarray(pd.Index(team_values).isin([int(team) for team in teams]))
+    return mask
+
+
+class _WatchedFileHandler(FileSystemEventHandler):
+    """
+    Forwards changes to raw CSV exports and OPR dumps to the store. Everything the store writes
+    itself (the filtered store and the raw cache) is ignored, to avoid refreshing in a loop.
+    """
+
+    def __init__(self, store: ScoutingDataStore):
+        self.store = store
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        if event.event_type not in CHANGE_EVENT_TYPES:
+            return
+        paths: List[str] = [event.src_path, getattr(event, "dest_path", "")]
+        for path in paths:
+            parts: List[str] = os.path.normpath(path).split(os.sep) if path else []
+            if len(parts) >= 5 and parts[0] == "data" and parts[2] == "raw":
+                if parts[-1].endswith(".csv"):
+                    self.store._schedule_refresh()
+            elif len(parts) == 2 and parts[0] == "tba_oprs" and parts[1].endswith(".json"):
+                self.store._schedule_refresh()
+
+
+@st.cache_resource
+def get_data_store() -> ScoutingDataStore:
+    """
+    The single data store of this Streamlit server, loaded by the first session that needs it.
+    """
+    store = ScoutingDataStore()
+    store.watch()
+    return store
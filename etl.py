@@ -0,0 +1,234 @@
+"""
+Builds the filtered scouting store from the raw tablet exports.
+
+For every event, the raw CSVs under `data/<event>/raw/{match,pit}` are parsed with their typed
+schema (see `schema.py`), deduplicated and enriched with the derived per-match metrics, then
+written to `data/<event>/filtered/<kind>.parquet`. Events are processed in parallel, and an event
+whose raw exports have not changed since the last run is skipped, so the ETL can be rerun after
+every export during an event.
+
+The match scouting of every rebuilt event is also checked against the rules of `validation.py`,
+and its quality report is written to `data/<event>/filtered/validation.json`.
+
+Usage:
+    python etl.py [--event EVENT ...] [--workers N] [--force]
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from query_data import (
+    FILTERED_FOLDER,
+    SCOUTING_KINDS,
+    find_duplicate_raw_files,
+    get_events_available,
+    get_filtered_path,
+    get_tba_opr_teams,
+    get_validation_path,
+    list_raw_scouting_files,
+    load_raw_scouting_files,
+    load_validation_report,
+)
+from schema import get_row_keys
+from seasons import add_derived_metrics
+from validation import ValidationContext, build_report, validate
+
+# Bump whenever the transformations below change, so every event gets rebuilt on the next run
+ETL_VERSION: int = 6
+
+MANIFEST_FILE: str = "manifest.json"
+
+SORT_COLUMNS: Dict[str, List[str]] = {
+    "match": ["match.number", "team.number", "timestamp"],
+    "pit": ["team.number", "timestamp"],
+}
+
+
+def transform(kind: str, raw_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turn the raw exports of one event into its filtered data.
+    """
+    # Tablets re-export rows they already exported, so only keep the first export of every row
+    data: pd.DataFrame = raw_data[~get_row_keys(raw_data, kind).duplicated()]
+
+    if kind == "match":
+        data = add_derived_metrics(data)
+
+    sort_columns: List[str] = [column for column in SORT_COLUMNS[kind] if column in data.columns]
+    return data.sort_values(by=sort_columns).reset_index(drop=True)
+
+
+def find_duplicates() -> Dict[str, Dict[str, str]]:
+    """
+    The raw exports duplicating another export (see `query_data.find_duplicate_raw_files`), by
+    kind of scouting. Duplicates are found across every event, so they are found once for a
+    whole run rather than by every event.
+    """
+    return {kind: find_duplicate_raw_files(kind) for kind in SCOUTING_KINDS}
+
+
+def _get_input_signatures(event: str, kind: str, duplicates: Dict[str, str]) -> Dict[str, list]:
+    """
+    Signature of every raw export of an event. Whether an export duplicates another one is part
+    of its signature, so deleting the original of a duplicate rebuilds the event of its copy.
+    """
+    signatures: Dict[str, list] = {}
+    for _, file_path in list_raw_scouting_files(kind, events=[event]):
+        stat = os.stat(file_path)
+        signatures[os.path.basename(file_path)] = [
+            stat.st_size,
+            stat.st_mtime_ns,
+            duplicates.get(file_path),
+        ]
+    return signatures
+
+
+def _read_manifest(event: str) -> dict:
+    try:
+        with open(os.path.join("data", event, FILTERED_FOLDER, MANIFEST_FILE), "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(event: str, manifest: dict) -> None:
+    path: str = os.path.join("data", event, FILTERED_FOLDER, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def _validate_event(event: str, signatures: Dict[str, list]) -> Optional[dict]:
+    """
+    Check the filtered match scouting of an event against the validation rules and write its
+    quality report. Only the rows of new or changed exports go through the row-local rules.
+    """
+    match_path: str = get_filtered_path(event, "match")
+    output_path: str = get_validation_path(event)
+    if not os.path.exists(match_path):
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return None
+
+    match_data: pd.DataFrame = pd.read_parquet(match_path)
+    pit_path: str = get_filtered_path(event, "pit")
+    pit_teams: List[int] = (
+        pd.read_parquet(pit_path, columns=["team.number"])["team.number"].dropna().tolist()
+        if os.path.exists(pit_path)
+        else []
+    )
+    known_teams: List[int] = sorted(set(pit_teams) | set(get_tba_opr_teams(event)))
+    context = ValidationContext(np.array(known_teams, dtype=np.int64) if known_teams else None)
+
+    previous: dict = load_validation_report(event) or {}
+    issues: pd.DataFrame = validate(
+        match_data,
+        context,
+        previous_files=previous.get("files"),
+        signatures=signatures,
+        previous_key=previous.get("key"),
+        version=ETL_VERSION,
+    )
+    report: dict = build_report(match_data, issues, signatures=signatures, version=ETL_VERSION)
+
+    with open(f"{output_path}.tmp", "w") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+    os.replace(f"{output_path}.tmp", output_path)
+    return report
+
+
+def run_event(
+    event: str, force: bool = False, duplicates: Optional[Dict[str, Dict[str, str]]] = None
+) -> dict:
+    """
+    Rebuild the filtered store of a single event, skipping every kind of scouting whose raw
+    exports are unchanged since the last run. `duplicates` are the duplicate exports from
+    `find_duplicates`, found again when not given.
+
+    Returns:
+        A summary of the run with the number of rows written for each rebuilt kind.
+    """
+    start: float = time.perf_counter()
+    manifest: dict = _read_manifest(event)
+    if manifest.get("version") != ETL_VERSION:
+        manifest = {"version": ETL_VERSION, "inputs": {}}
+
+    duplicates = find_duplicates() if duplicates is None else duplicates
+    summary: dict = {"event": event, "rebuilt": [], "rows": {}}
+    os.makedirs(os.path.join("data", event, FILTERED_FOLDER), exist_ok=True)
+
+    for kind in SCOUTING_KINDS:
+        signatures: Dict[str, list] = _get_input_signatures(event, kind, duplicates[kind])
+        output_path: str = get_filtered_path(event, kind)
+
+        is_current: bool = manifest["inputs"].get(kind) == signatures
+        if is_current and not force:
+            continue
+
+        raw_data, _ = load_raw_scouting_files(kind, events=[event], duplicates=duplicates[kind])
+        if not raw_data.empty:
+            data: pd.DataFrame = transform(kind, raw_data)
+            data.to_parquet(f"{output_path}.tmp", engine="pyarrow", index=False)
+            os.replace(f"{output_path}.tmp", output_path)
+            summary["rows"][kind] = len(data)
+            summary["rebuilt"].append(kind)
+        elif os.path.exists(output_path):
+            os.remove(output_path)
+            summary["rebuilt"].append(kind)
+
+        manifest["inputs"][kind] = signatures
+
+    # The teams of the pit scouting are part of the checks, so either kind triggers a validation
+    if summary["rebuilt"] or not os.path.exists(get_validation_path(event)):
+        report: Optional[dict] = _validate_event(event, manifest["inputs"].get("match", {}))
+        summary["issues"] = len(report["rows"]) if report else 0
+
+    _write_manifest(event, manifest)
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+
+def run(
+    events: Optional[List[str]] = None, max_workers: Optional[int] = None, force: bool = False
+) -> List[dict]:
+    """
+    Rebuild the filtered store of the given events (every event by default) in parallel.
+    """
+    events = events if events is not None else get_events_available()
+    # Every worker would otherwise hash every export, and race to write the same cache entries
+    duplicates: Dict[str, Dict[str, str]] = find_duplicates()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(
+            executor.map(run_event, events, [force] * len(events), [duplicates] * len(events))
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the filtered scouting data store.")
+    parser.add_argument(
+        "--event",
+        dest="events",
+        action="append",
+        help="Only process this event. Can be repeated. Defaults to every event in `data`.",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument(
+        "--force", action="store_true", help="Rebuild even if the raw exports are unchanged."
+    )
+    args = parser.parse_args()
+
+    for summary in run(events=args.events, max_workers=args.workers, force=args.force):
+        rebuilt: str = ", ".join(
+            f"{kind} ({summary['rows'].get(kind, 0)} rows)" for kind in summary["rebuilt"]
+        )
+        issues: str = f", {summary['issues']} rows with issues" if "issues" in summary else ""
+        print(f"{summary['event']}: {rebuilt or 'up to date'} in {summary['seconds']:.2f}s{issues}")
+
+
+if __name__ == "__main__":
+    main()
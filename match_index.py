@@ -0,0 +1,146 @@
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+import pyarrow as pa
+
+
+def _pack_keys(events, teams, matches) -> np.ndarray:
+    """
+    Pack (event code, team number, match number) into a single int64 that sorts the same way.
+    Team and match numbers are both stored as 16-bit integers by the schema.
+    """
+    return (
+        (np.asarray(events, np.int64) << 32)
+        | (np.asarray(teams, np.int64) << 16)
+        | np.asarray(matches, np.int64)
+    )
+
+
+class MatchIndex:
+    """
+    Match scouting data kept sorted by (event, team.number, match.number), along with the packed
+    sort keys and the offsets of every (event, team.number) group.
+
+    Selecting an event, a team or matches of a team is a binary search followed by zero-copy
+    slices of the sorted table, instead of a full boolean scan and copy. Selecting matches across
+    every team goes through a second ordering of the rows by (event, match.number).
+    """
+
+    def __init__(self, table: pa.Table):
+        event_names = table.column("event").cast(pa.string()).fill_null("")
+        self.events, event_codes = np.unique(
+            event_names.to_numpy(zero_copy_only=False), return_inverse=True
+        )
+        teams: np.ndarray = table.column("team.number").fill_null(0).to_numpy()
+        matches: np.ndarray = table.column("match.number").fill_null(0).to_numpy()
+
+        order: np.ndarray = np.lexsort((matches, teams, event_codes))
+        event_codes, teams, matches = event_codes[order], teams[order], matches[order]
+        self.table: pa.Table = table.take(order)
+        self.keys: np.ndarray = _pack_keys(event_codes, teams, matches)
+
+        # Start of every (event, team.number) group, plus the end of the table
+        group_keys: np.ndarray = self.keys >> 16
+        self.group_offsets: np.ndarray = np.concatenate(
+            [[0], np.flatnonzero(np.diff(group_keys)) + 1, [len(self.keys)]]
+        ).astype(np.int64)
+        self.group_keys: np.ndarray = group_keys[self.group_offsets[:-1]]
+
+        # Positions in the sorted table ordered by (event, match.number, team.number), to select
+        # matches across teams
+        self.match_order: np.ndarray = np.lexsort((teams, matches, event_codes))
+        self.match_keys: np.ndarray = _pack_keys(
+            event_codes[self.match_order], matches[self.match_order], teams[self.match_order]
+        )
+
+    def _get_event_code(self, event: str) -> Optional[int]:
+        position: int = int(np.searchsorted(self.events, event))
+        if position < len(self.events) and self.events[position] == event:
+            return position
+        return None
+
+    def _get_range(self, keys: np.ndarray, low: int, high: int) -> Tuple[int, int]:
+        return int(np.searchsorted(keys, low)), int(np.searchsorted(keys, high))
+
+    def get_teams(self, event: str) -> List[int]:
+        """
+        Team numbers scouted at the event, in increasing order.
+        """
+        code: Optional[int] = self._get_event_code(event)
+        if code is None:
+            return []
+        low, high = self._get_range(self.group_keys, code << 16, (code + 1) << 16)
+        return (self.group_keys[low:high] & 0xFFFF).tolist()
+
+    def get_matches(self, event: str, team: Optional[int] = None) -> List[int]:
+        """
+        Match numbers scouted at the event (for a single team, if given), in increasing order.
+        """
+        code: Optional[int] = self._get_event_code(event)
+        if code is None:
+            return []
+        if team is None:
+            low, high = self._get_range(self.match_keys, code << 32, (code + 1) << 32)
+            return np.unique((self.match_keys[low:high] >> 16) & 0xFFFF).tolist()
+
+        low, high = self._get_range(
+            self.keys, _pack_keys(code, team, 0), _pack_keys(code, team + 1, 0)
+        )
+        return np.unique(self.keys[low:high] & 0xFFFF).tolist()
+
+    def select(
+        self,
+        events: Optional[Iterable[str]] = None,
+        teams: Optional[Iterable[int]] = None,
+        matches: Optional[Iterable[int]] = None,
+    ) -> pa.Table:
+        """
+        Rows of the given events, teams and matches (every value when None), sorted by
+        (event, team.number, match.number).
+        """
+        codes: List[int] = (
+            list(range(len(self.events)))
+            if events is None
+            else [code for code in map(self._get_event_code, events) if code is not None]
+        )
+        teams = sorted(set(int(team) for team in teams)) if teams else None
+        matches = sorted(set(int(match) for match in matches)) if matches else None
+
+        if teams is None and matches is not None:
+            positions: List[np.ndarray] = []
+            for code in codes:
+                for match in matches:
+                    low, high = self._get_range(
+                        self.match_keys,
+                        _pack_keys(code, match, 0),
+                        _pack_keys(code, match + 1, 0),
+                    )
+                    positions.append(self.match_order[low:high])
+            indices: np.ndarray = np.sort(np.concatenate(positions or [np.empty(0, np.int64)]))
+            return self.table.take(pa.array(indices, pa.int64()))
+
+        ranges: List[Tuple[int, int]] = []
+        for code in codes:
+            if teams is None:
+                ranges.append(self._get_range(self.keys, code << 32, (code + 1) << 32))
+                continue
+            for team in teams:
+                if matches is None:
+                    ranges.append(
+                        self._get_range(
+                            self.keys, _pack_keys(code, team, 0), _pack_keys(code, team + 1, 0)
+                        )
+                    )
+                    continue
+                for match in matches:
+                    ranges.append(
+                        self._get_range(
+                            self.keys,
+                            _pack_keys(code, team, match),
+                            _pack_keys(code, team, match + 1),
+                        )
+                    )
+
+        slices: List[pa.Table] = [self.table.slice(low, high - low) for low, high in ranges]
+        if not slices:
+            return self.table.slice(0, 0)
+        return pa.concat_tables(slices) if len(slices) > 1 else slices[0]
@@ -0,0 +1,88 @@
+from typing import Dict, List, NamedTuple
+import numpy as np
+import pandas as pd
+
+# Where notes can be shot from in each period. Medium range shots are not scouted in Auto.
+SHOOTING_LOCATIONS: Dict[str, List[str]] = {
+    "teleop": ["subwoofer", "amp", "podium", "medium", "midfield"],
+    "auto": ["subwoofer", "amp", "podium", "midfield"],
+}
+
+
+class ShootingMetric(NamedTuple):
+    """
+    The share of completed shots from a location during a period of the match.
+
+    The scouting app records misses as `attempted`, so the average is
+    `completed / (completed + attempted)`, and 0 when nothing was shot.
+    """
+
+    location: str
+    period: str
+
+    @property
+    def completed(self) -> str:
+        return f"{self.location}.completed.{self.period}"
+
+    @property
+    def attempted(self) -> str:
+        return f"{self.location}.attempted.{self.period}"
+
+    @property
+    def average(self) -> str:
+        return f"{self.location}.{self.period}.average"
+
+
+SHOOTING_METRICS: List[ShootingMetric] = [
+    ShootingMetric(location, period)
+    for period, locations in SHOOTING_LOCATIONS.items()
+    for location in locations
+]
+
+
+def compute_shooting_averages(
+    match_data: pd.DataFrame, metrics: List[ShootingMetric] = SHOOTING_METRICS
+) -> pd.DataFrame:
+    """
+    Compute every shooting average in a single pass over a 2-D array of the shot counters, with
+    missing counters counted as 0.
+
+    Returns:
+        One column per metric, named after `ShootingMetric.average`, aligned with `match_data`.
+    """
+    columns: List[str] = [metric.completed for metric in metrics]
+    columns += [metric.attempted for metric in metrics]
+    counters: np.ndarray = match_data.reindex(columns=columns).to_numpy(
+        dtype=np.float64, na_value=0
+    )
+
+    completed: np.ndarray = counters[:, : len(metrics)]
+    shots: np.ndarray = completed + counters[:, len(metrics) :]
+    averages: np.ndarray = np.divide(
+        completed, shots, out=np.zeros_like(completed), where=shots > 0
+    )
+
+    return pd.DataFrame(
+        averages, index=match_data.index, columns=[metric.average for metric in metrics]
+    )
+
+
+def add_shooting_averages(
+    match_data: pd.DataFrame, metrics: List[ShootingMetric] = SHOOTING_METRICS
+) -> pd.DataFrame:
+    """
+    Fill in missing shot counters with 0 and add the shooting average of every metric,
+    replacing the averages already in `match_data` (e.g. when read from the filtered store).
+    """
+    averages: pd.DataFrame = compute_shooting_averages(match_data, metrics)
+
+    counter_columns: List[str] = [
+        column
+        for metric in metrics
+        for column in (metric.completed, metric.attempted)
+        if column in match_data.columns
+    ]
+    match_data = match_data.drop(columns=averages.columns, errors="ignore")
+    match_data[counter_columns] = match_data[counter_columns].fillna(0)
+
+    return pd.concat([match_data, averages], axis=1)
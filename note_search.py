@@ -0,0 +1,172 @@
+import math
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# Free text written by the scouters, by kind of scouting
+NOTE_COLUMNS: Dict[str, str] = {"match": "summary.end", "pit": "other.notes"}
+
+# Columns every note is identified by. Pit notes have no match number.
+NOTE_KEY_COLUMNS: List[str] = ["event", "team.number", "match.number"]
+
+# Words of a note, compared ignoring case
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Phrases are written between double quotes in a search, e.g. `"note stuck" intake`
+PHRASE_PATTERN = re.compile(r'"([^"]*)"')
+
+# BM25 parameters: how quickly repeating a word stops mattering, and how much long notes are
+# penalized
+BM25_K1: float = 1.2
+BM25_B: float = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def parse_search(search: str) -> Tuple[List[str], List[List[str]]]:
+    """
+    Split a search into its keywords and its quoted phrases (as lists of words).
+    """
+    phrases: List[List[str]] = [tokenize(phrase) for phrase in PHRASE_PATTERN.findall(search)]
+    keywords: List[str] = tokenize(PHRASE_PATTERN.sub(" ", search))
+    return keywords, [phrase for phrase in phrases if phrase]
+
+
+class NoteIndex:
+    """
+    Inverted index of the notes of the match and pit scouting, built once when the data is
+    loaded.
+
+    Every word maps to the notes it appears in and its positions in them, so a search only
+    touches the notes containing its words. Keywords are ranked with BM25, and quoted phrases
+    must appear in the note with their words in order.
+    """
+
+    def __init__(self, notes: pd.DataFrame):
+        """
+        Args:
+            notes: One row per note, in the columns `kind`, `NOTE_KEY_COLUMNS` and `note` (see
+                `collect_notes`).
+        """
+        self.notes: pd.DataFrame = notes.reset_index(drop=True)
+        # word -> note -> positions of the word in the note
+        self._postings: Dict[str, Dict[int, List[int]]] = defaultdict(dict)
+
+        lengths: List[int] = []
+        for position, text in enumerate(self.notes["note"].tolist()):
+            tokens: List[str] = tokenize(text)
+            lengths.append(len(tokens))
+            for offset, token in enumerate(tokens):
+                self._postings[token].setdefault(position, []).append(offset)
+
+        self._lengths: np.ndarray = np.array(lengths, dtype=np.float64)
+        self._average_length: float = float(self._lengths.mean()) if lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+    def _get_idf(self, token: str) -> float:
+        count: int = len(self._postings.get(token, {}))
+        return math.log(1 + (len(self) - count + 0.5) / (count + 0.5))
+
+    def _score(self, token: str, scores: np.ndarray) -> None:
+        """
+        Add the BM25 score of a word to the score of every note containing it.
+        """
+        postings: Dict[int, List[int]] = self._postings.get(token, {})
+        if not postings:
+            return
+        positions: np.ndarray = np.fromiter(postings, dtype=np.int64, count=len(postings))
+        frequencies: np.ndarray = np.fromiter(
+            map(len, postings.values()), dtype=np.float64, count=len(postings)
+        )
+        norms: np.ndarray = BM25_K1 * (
+            1 - BM25_B + BM25_B * self._lengths[positions] / self._average_length
+        )
+        scores[positions] += (
+            self._get_idf(token) * frequencies * (BM25_K1 + 1) / (frequencies + norms)
+        )
+
+    def _match_phrase(self, phrase: List[str]) -> List[int]:
+        """
+        Notes containing the words of the phrase next to each other, in order.
+        """
+        postings: List[Dict[int, List[int]]] = [self._postings.get(token, {}) for token in phrase]
+        candidates = set(postings[0]).intersection(*postings[1:])
+        matches: List[int] = []
+        for note in candidates:
+            starts = set(postings[0][note])
+            for offset, token_postings in enumerate(postings[1:], start=1):
+                starts &= {position - offset for position in token_postings[note]}
+            if starts:
+                matches.append(note)
+        return matches
+
+    def search(
+        self,
+        search: str,
+        kinds: Optional[List[str]] = None,
+        events: Optional[List[str]] = None,
+        teams: Optional[List[int]] = None,
+        top_k: int = 100,
+    ) -> pd.DataFrame:
+        """
+        The `top_k` notes matching a search, best first. Notes match any keyword, and must contain
+        every quoted phrase.
+
+        Returns:
+            The matching rows of `notes`, with their score in `score`.
+        """
+        keywords, phrases = parse_search(search)
+        scores: np.ndarray = np.zeros(len(self))
+        for token in keywords + [token for phrase in phrases for token in phrase]:
+            self._score(token, scores)
+
+        matches: np.ndarray = scores > 0
+        for phrase in phrases:
+            phrase_matches = np.zeros(len(self), dtype=bool)
+            phrase_matches[self._match_phrase(phrase)] = True
+            matches &= phrase_matches
+        if kinds is not None:
+            matches &= self.notes["kind"].isin(kinds).to_numpy()
+        if events is not None:
+            matches &= self.notes["event"].isin(events).to_numpy()
+        if teams:
+            matches &= self.notes["team.number"].isin(teams).fillna(False).to_numpy(dtype=bool)
+
+        positions: np.ndarray = np.flatnonzero(matches)
+        if len(positions) > top_k:
+            positions = positions[np.argpartition(-scores[positions], top_k - 1)[:top_k]]
+        positions = positions[np.argsort(-scores[positions], kind="stable")]
+
+        hits: pd.DataFrame = self.notes.iloc[positions].copy()
+        hits["score"] = scores[positions]
+        return hits.reset_index(drop=True)
+
+
+def collect_notes(scouting_data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Every non-empty note of the scouting data (by kind, see `query_data.SCOUTING_KINDS`), with
+    the kind of scouting and the keys of the note, ready for `NoteIndex`.
+    """
+    parts: List[pd.DataFrame] = []
+    for kind, column in NOTE_COLUMNS.items():
+        data: Optional[pd.DataFrame] = scouting_data.get(kind)
+        if data is None or column not in data.columns:
+            continue
+        notes: pd.Series = data[column].astype("string").str.strip()
+        data = data[notes.fillna("").ne("").to_numpy(dtype=bool)]
+        part: pd.DataFrame = data.reindex(columns=NOTE_KEY_COLUMNS).astype(
+            {"event": "string", "team.number": "UInt16", "match.number": "UInt16"}
+        )
+        part.insert(0, "kind", kind)
+        part["note"] = notes[data.index]
+        parts.append(part)
+
+    if not parts:
+        return pd.DataFrame(columns=["kind", *NOTE_KEY_COLUMNS, "note"])
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,157 @@
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+
+from scoring import SCORING_PERIODS, get_points_column
+from seasons import CURRENT_SEASON, SEASONS, SeasonProfile
+
+# Columns identifying the alliance a scouted robot played on
+ALLIANCE_KEY_COLUMNS: List[str] = ["match.number", "team.alliance"]
+
+
+def get_opr_components(profile: SeasonProfile = SEASONS[CURRENT_SEASON]) -> List[str]:
+    """
+    Scored components an OPR is computed for: the points of every period and in total, then every
+    counter and boolean the season scores points for.
+    """
+    components: List[str] = [get_points_column(period) for period in SCORING_PERIODS]
+    components.append(get_points_column("total"))
+    for term in profile.scoring_terms:
+        if term.value is None and term.column not in components:
+            components.append(term.column)
+    return components
+
+
+class OprSolver:
+    """
+    Offensive power ratings of the teams of one event, computed from scouted match rows.
+
+    The score of an alliance is modelled as the sum of the contributions of its robots, so the
+    contributions of every team are the least squares solution of `A x = b`, where `A` has a row
+    per alliance with a 1 for every team on it and `b` holds the alliance scores. Every component
+    (COPR) is solved at once, as a column of `b`.
+
+    Only the normal equations `AᵀA` and `Aᵀb` are kept. Adding an alliance adds its outer
+    product, and an alliance whose rows changed is subtracted before being added again, so
+    ingesting new matches never rebuilds the design matrix of the whole event.
+    """
+
+    def __init__(self, components: List[str]):
+        self.components: List[str] = components
+        self.teams: List[int] = []
+        self._team_positions: Dict[int, int] = {}
+        self._ata: np.ndarray = np.zeros((0, 0))
+        self._atb: np.ndarray = np.zeros((0, len(components)))
+
+        # Teams and scores of every ingested alliance, to detect and undo changes
+        self._alliances: Dict[Tuple[int, str], Tuple[Tuple[int, ...], np.ndarray]] = {}
+
+    def _add_teams(self, teams: List[int]) -> None:
+        new_teams: List[int] = [
+            team for team in dict.fromkeys(teams) if team not in self._team_positions
+        ]
+        if not new_teams:
+            return
+        for team in new_teams:
+            self._team_positions[team] = len(self.teams)
+            self.teams.append(team)
+        size: int = len(self.teams)
+        self._ata = np.pad(self._ata, ((0, size - len(self._ata)), (0, size - len(self._ata))))
+        self._atb = np.pad(self._atb, ((0, size - len(self._atb)), (0, 0)))
+
+    def _accumulate(
+        self, alliance_teams: List[Tuple[int, ...]], scores: np.ndarray, sign: float
+    ) -> None:
+        design: np.ndarray = np.zeros((len(alliance_teams), len(self.teams)))
+        for row, teams in enumerate(alliance_teams):
+            design[row, [self._team_positions[team] for team in teams]] = 1
+        self._ata += sign * (design.T @ design)
+        self._atb += sign * (design.T @ scores)
+
+    def update(self, match_data: pd.DataFrame) -> int:
+        """
+        Ingest the scouted rows of the event. Alliances already ingested with the same robots and
+        scores are skipped, changed alliances replace their previous version, and alliances no
+        longer in the rows (e.g. a renumbered match or a deleted export) are subtracted. Rows
+        without an alliance, e.g. of seasons that do not scout it, are never ingested.
+
+        Returns:
+            The number of alliances added or changed.
+        """
+        keys: pd.DataFrame = match_data.reindex(columns=[*ALLIANCE_KEY_COLUMNS, "team.number"])
+        complete: np.ndarray = keys.notna().all(axis=1).to_numpy()
+
+        groups: Dict[tuple, np.ndarray] = {}
+        if complete.any():
+            # Robots scouted more than once in a match count with their average
+            robots: pd.DataFrame = (
+                match_data.loc[complete]
+                .reindex(columns=self.components)
+                .astype(np.float64)
+                .fillna(0)
+                .groupby([column.astype(object) for _, column in keys.loc[complete].items()])
+                .mean()
+            )
+            values: np.ndarray = robots.to_numpy()
+            team_numbers: np.ndarray = robots.index.get_level_values(-1).to_numpy(dtype=np.int64)
+            groups = robots.groupby(level=[0, 1], sort=False).indices
+
+        removed_teams: List[Tuple[int, ...]] = []
+        removed_scores: List[np.ndarray] = []
+        added_teams: List[Tuple[int, ...]] = []
+        added_scores: List[np.ndarray] = []
+        current: Set[Tuple[int, str]] = set()
+        for key, positions in groups.items():
+            key = (int(key[0]), str(key[1]))
+            current.add(key)
+            teams: Tuple[int, ...] = tuple(team_numbers[positions].tolist())
+            scores: np.ndarray = values[positions].sum(axis=0)
+
+            previous: Optional[Tuple[Tuple[int, ...], np.ndarray]] = self._alliances.get(key)
+            if previous is not None:
+                if previous[0] == teams and np.array_equal(previous[1], scores):
+                    continue
+                removed_teams.append(previous[0])
+                removed_scores.append(previous[1])
+            self._alliances[key] = (teams, scores)
+            added_teams.append(teams)
+            added_scores.append(scores)
+
+        for key in [key for key in self._alliances if key not in current]:
+            teams, scores = self._alliances.pop(key)
+            removed_teams.append(teams)
+            removed_scores.append(scores)
+
+        if removed_teams:
+            self._accumulate(removed_teams, np.array(removed_scores), -1)
+        if added_teams:
+            self._add_teams([team for teams in added_teams for team in teams])
+            self._accumulate(added_teams, np.array(added_scores), 1)
+        return len(added_teams)
+
+    def solve(self) -> pd.DataFrame:
+        """
+        Contribution of every team to every component, solved from the normal equations. Teams
+        that cannot be told apart (e.g. always played together) share their contributions.
+        """
+        # Teams whose every alliance was subtracted have no alliances left to solve for
+        playing: np.ndarray = np.diag(self._ata) > 0.5
+        contributions: np.ndarray = np.linalg.lstsq(
+            self._ata[np.ix_(playing, playing)], self._atb[playing], rcond=None
+        )[0]
+        return pd.DataFrame(
+            contributions,
+            index=pd.Index(np.array(self.teams, dtype=np.int64)[playing], name="team.number"),
+            columns=self.components,
+        ).sort_index()
+
+
+def compute_oprs(
+    match_data: pd.DataFrame, components: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    OPR and COPRs of every team of a single event, from its scouted match rows.
+    """
+    solver = OprSolver(get_opr_components() if components is None else components)
+    solver.update(match_data)
+    return solver.solve()
@@ -1,11 +1,13 @@
-from typing import List, TypeVar
+from typing import Dict, List, TypeVar
+import numpy as np
 import streamlit as st
 import pandas as pd
 
-from query_data import get_events_available, query_all_pit_scouting_data, query_pit_scouting_data_by_event
+from data_grid import render_grid
+from data_store import get_data_store
+from pit_options import PIT_LIST_COLUMNS, match_options
+from query_data import get_events_available
 
-from st_aggrid import AgGrid, GridOptionsBuilder
-from st_aggrid.shared import ExcelExportMode
 
 st.set_page_config(
     page_title="Match Analytics",
@@ -16,7 +18,17 @@ st.title("Pit Scouting Analysis")
 event: str = ""
 team_number: int = 0
 
-pit_data: pd.DataFrame = query_all_pit_scouting_data().sort_values(by=['team.number'])
+# The multiple choice answers are parsed once by the data store. The index of `pit_data` is the
+# position of every record, which `pit_lists` refers to in `row`, so all three come from the
+# same snapshot.
+data_store = get_data_store().get_snapshot()
+pit_data: pd.DataFrame = data_store.query_pit_scouting()
+pit_options: pd.DataFrame = data_store.query_pit_options()
+pit_lists: pd.DataFrame = data_store.query_pit_lists()
+
+order: np.ndarray = np.argsort(pit_data['team.number'].to_numpy(), kind="stable")
+pit_data = pit_data.iloc[order]
+pit_options = pit_options.iloc[order]
 
 
 column1, column2 = st.columns(2)
@@ -34,11 +46,33 @@ with column2:
         index=None
     )
 
+with st.expander("Filter by capabilities"):
+    drive_trains: List[str] = st.multiselect(
+        label="Drive Train", options=pit_data['robot.drive.train'].dropna().unique().tolist()
+    )
+    required: Dict[str, List[str]] = {}
+    filter_columns = st.columns(3)
+    for position, column in enumerate(PIT_LIST_COLUMNS):
+        with filter_columns[position % 3]:
+            required[column] = st.multiselect(
+                label=" ".join(word.capitalize() for word in column.split(".")[1:]),
+                options=pit_options[column].columns.tolist()
+                if column in pit_options.columns.get_level_values("column")
+                else [],
+            )
+
+# Every filter is a column of booleans, so they are all applied at once
+selected: np.ndarray = match_options(pit_options, required)
+if drive_trains:
+    selected &= pit_data['robot.drive.train'].isin(drive_trains).to_numpy()
+
 if event:
-    pit_data = pit_data[pit_data['event'] == event]
+    selected &= pit_data['event'].eq(event).fillna(False).to_numpy(dtype=bool)
 
 if team_number:
-    pit_data = pit_data[pit_data['team.number'] == team_number]
+    selected &= pit_data['team.number'].eq(team_number).fillna(False).to_numpy(dtype=bool)
+
+pit_data = pit_data[selected]
 
 bulk_pit_data = pit_data.copy()
 bulk_pit_data['team.number'] = bulk_pit_data['team.number'].astype(str)
@@ -48,27 +82,14 @@ st.header(
     anchor="pit-data",
     help="You can download the full data by right-clicking and tapping 'Export'",
 )
-data_grid = GridOptionsBuilder.from_dataframe(pit_data)
-data_grid.configure_pagination(enabled=True, paginationPageSize=10)
-data_grid.configure_default_column(groupable="true", filterable="true")
-data_grid.configure_grid_options(alwaysShowHorizontalScroll=True)
-data_grid.configure_side_bar(filters_panel=True)
-
-AgGrid(
-    pit_data,
-    gridOptions=data_grid.build(),
-    excel_export_mode=ExcelExportMode.MANUAL,
-    allow_unsafe_jscode=True,
-    custom_css={
-        "#gridToolBar": {
-            "padding-bottom": "0px !important",
-        }
-    },
-)
+render_grid(pit_data)
 
 
 if len(pit_data) == 1:
     entry = pit_data.iloc[0]
+    answers: Dict[str, List[str]] = (
+        pit_lists[pit_lists['row'] == entry.name].groupby('column', sort=False)['value'].agg(list)
+    ).to_dict()
 
 
     st.header("Physical Characteristics")
@@ -98,7 +119,7 @@ if len(pit_data) == 1:
     st.header("Driving cabilities")
     st.write(f"Team {entry['team.number']} uses a `{entry['robot.drive.train']}` drive train.")
     st.write(f"They specified that they use the following motors in their drive train:")
-    for motor in entry['robot.drive.motors'].strip('[]').split(', '):
+    for motor in answers.get('robot.drive.motors', ['']):
         st.write(f"- {motor}")
 
     if entry['robot.drive.train'] == "Swerve":
@@ -107,11 +128,11 @@ if len(pit_data) == 1:
 
     st.header("Mechanism Capabilities")
     st.write(f"They specified that they use the following motors in their subsystems:")
-    for motor in entry['robot.mechanism.motors'].strip('[]').split(', '):
+    for motor in answers.get('robot.mechanism.motors', ['']):
         st.write(f"- {motor}")
 
     st.write("For loading notes, they specified that they load with the following methods:")
-    for intake in entry['robot.intake.method'].strip('[]').split(', '):
+    for intake in answers.get('robot.intake.method', ['']):
         st.write(f"- {intake}")
 
     st.write("When asked how they plan to climb, they said the following:")
@@ -123,21 +144,22 @@ if len(pit_data) == 1:
     st.header("Software capabilities")
     st.subheader("Vision")
     st.write("The team specified that they are using the following softwares for Vision.")    
-    for software in entry['robot.vision.software'].strip('[]').split(', '):
+    for software in answers.get('robot.vision.software', ['']):
         software = software or "None"
         st.write(f"- {software}")
     st.write("With the following cameras specified:")
-    for camera in entry['robot.vision.cameras'].strip('[]').split(', '):
+    for camera in answers.get('robot.vision.cameras', ['']):
         camera = camera or "None"
         st.write(f"- {camera}")
     
     st.subheader("Autonomous Software")
     st.write("The team specified that they use the following software for autonomous")
-    for software in entry['robot.auto.software'].strip('[]').split(', '):
+    for software in answers.get('robot.auto.software', ['']):
         software = software or "None"
         st.write(f"- {software}")
         
     st.header("Closing Remarks")
     st.write("Other comments left from the Pit Scouter are as follows:")
-    last_notes = entry['other.notes'].strip() or "None"
+    last_notes = entry['other.notes'] if pd.notna(entry['other.notes']) else ""
+    last_notes = last_notes.strip() or "None"
     st.write(f"- {last_notes}")
\ No newline at end of file
@@ -1,12 +1,15 @@
 from typing import List, TypeVar
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
 
-
-from st_aggrid import AgGrid, GridOptionsBuilder
-from st_aggrid.shared import ExcelExportMode
-
-from query_data import query_all_match_scouting_data, query_all_pit_scouting_data
+from charts import PERIOD_TITLES, get_period_chart, get_points_chart, get_team_breakdown
+from consensus import DISPUTED_COLUMN, SCOUTS_COLUMN, SPREAD_COLUMN
+from data_grid import get_pretty_column_name, prettify_columns, render_paged_grid
+from data_store import get_data_store
+from metrics import SHOOTING_LOCATIONS
+from rollups import ROLLUP_STATISTICS
+from scoring import SCORING_PERIODS
 
 st.set_page_config(
     page_title="Match Analytics",
@@ -20,190 +23,80 @@ event: str = ""
 team_number: int = 0
 match_selection: List[TypeVar] = []
 
-match_data: pd.DataFrame = query_all_match_scouting_data().sort_values(by=['team.number', 'match.number', 'event'])
-
-bulk_pit_data = match_data.copy()
-bulk_pit_data['team.number'] = bulk_pit_data['team.number'].astype(str)
+data_store = get_data_store()
 
 with column1:
     event = st.selectbox(
         label="Select Event",
         options=["Anderson", "Carrollton", "Johnson"])
+
 with column2:
     team_number = st.selectbox(
         label="Select Team Number",
-        options=match_data['team.number'].unique(),
+        options=data_store.get_teams(event.lower()),
         index=None
     )
 with column3:
     match_selection = st.multiselect(
             label="Select which matches you want to filter",
-            options=match_data['match.number'],
+            options=data_store.get_matches(event.lower(), team_number),
         )
 
-if event:
-    match_data = match_data[match_data['event'] == event.lower()]
-
-if team_number:
-    match_data = match_data[match_data['team.number'] == team_number]
-
-if match_selection:
-    match_data = match_data[match_data['match.number'].isin(match_selection)]
-
-
-# Teleop
-match_data['subwoofer.attempted.teleop'] = match_data['subwoofer.attempted.teleop'].fillna(0)
-match_data['subwoofer.completed.teleop'] = match_data['subwoofer.completed.teleop'].fillna(0)
-
-match_data['amp.attempted.teleop'] = match_data['amp.attempted.teleop'].fillna(0)
-match_data['amp.completed.teleop'] = match_data['amp.completed.teleop'].fillna(0)
-
-match_data['podium.attempted.teleop'] = match_data['podium.attempted.teleop'].fillna(0)
-match_data['podium.completed.teleop'] = match_data['podium.completed.teleop'].fillna(0)
-
-match_data['medium.attempted.teleop'] = match_data['medium.attempted.teleop'].fillna(0)
-match_data['medium.completed.teleop'] = match_data['medium.completed.teleop'].fillna(0)
-
-match_data['midfield.attempted.teleop'] = match_data['midfield.attempted.teleop'].fillna(0)
-match_data['midfield.completed.teleop'] = match_data['midfield.completed.teleop'].fillna(0)
-
-# Auto
-match_data['subwoofer.attempted.auto'] = match_data['subwoofer.attempted.auto'].fillna(0)
-match_data['subwoofer.completed.auto'] = match_data['subwoofer.completed.auto'].fillna(0)
-
-match_data['amp.attempted.auto'] = match_data['amp.attempted.auto'].fillna(0)
-match_data['amp.completed.auto'] = match_data['amp.completed.auto'].fillna(0)
-
-match_data['podium.attempted.auto'] = match_data['podium.attempted.auto'].fillna(0)
-match_data['podium.completed.auto'] = match_data['podium.completed.auto'].fillna(0)
-
-# match_data['medium.attempted.auto'] = match_data['medium.attempted.auto'].fillna(0)
-# match_data['medium.completed.auto'] = match_data['medium.completed.auto'].fillna(0)
-
-match_data['midfield.attempted.auto'] = match_data['midfield.attempted.auto'].fillna(0)
-match_data['midfield.completed.auto'] = match_data['midfield.completed.auto'].fillna(0)
-
-
-# Teleop averages
-match_data['subwoofer.teleop.average'] = (
-    (match_data['subwoofer.completed.teleop'])
-    / (match_data['subwoofer.completed.teleop'] + match_data['subwoofer.attempted.teleop'])
-).fillna(0)
-
-match_data['amp.teleop.average'] = (
-    (match_data['amp.completed.teleop'])
-    / (match_data['amp.completed.teleop'] + match_data['amp.attempted.teleop'])
-).fillna(0)
-
-match_data['podium.teleop.average'] = (
-    (match_data['podium.completed.teleop'])
-    / (match_data['podium.completed.teleop'] + match_data['podium.attempted.teleop'])
-).fillna(0)
-
-match_data['medium.teleop.average'] = (
-    (match_data['medium.completed.teleop'])
-    / (match_data['medium.completed.teleop'] + match_data['medium.attempted.teleop'])
-).fillna(0)
-
-match_data['midfield.teleop.average'] = (
-    (match_data['midfield.completed.teleop'])
-    / (match_data['midfield.completed.teleop'] + match_data['midfield.attempted.teleop'])
-).fillna(0)
-
-
-# Auto averages
-match_data['subwoofer.auto.average'] = (
-    (match_data['subwoofer.completed.auto'])
-    / (match_data['subwoofer.completed.auto'] + match_data['subwoofer.attempted.auto'])
-).fillna(0)
-
-match_data['amp.auto.average'] = (
-    (match_data['amp.completed.auto'])
-    / (match_data['amp.completed.auto'] + match_data['amp.attempted.auto'])
-).fillna(0)
-
-match_data['podium.auto.average'] = (
-    (match_data['podium.completed.auto'])
-    / (match_data['podium.completed.auto'] + match_data['podium.attempted.auto'])
-).fillna(0)
-
-# match_data['medium.auto.average'] = (
-#     (match_data['medium.completed.auto'])
-#     / (match_data['medium.completed.auto'] + match_data['medium.attempted.auto'])
-# ).fillna(0)
-
-match_data['midfield.auto.average'] = (
-    (match_data['midfield.completed.auto'])
-    / (match_data['midfield.completed.auto'] + match_data['midfield.attempted.auto'])
-).fillna(0)
+# Comes back sorted by event, team number and match number
+match_table: pa.Table = data_store.query_match_table(
+    events=[event.lower()],
+    teams=[team_number] if team_number else None,
+    matches=match_selection or None,
+)
 
-match_data = match_data.reset_index(drop=True)
 
+# Only the rows of the current page of each grid are sent to the browser. The derived metrics are
+# already in the table, so the grids can be searched and sorted by them.
 st.header("Unedited Column Names")
+render_paged_grid(match_table, key="match_data.raw")
 
-data_grid = GridOptionsBuilder.from_dataframe(match_data)
-data_grid.configure_pagination(enabled=True, paginationPageSize=10)
-data_grid.configure_default_column(groupable="true", filterable="true")
-data_grid.configure_grid_options(alwaysShowHorizontalScroll=True)
-data_grid.configure_side_bar(filters_panel=True)
-
-AgGrid(
-    match_data,
-    gridOptions=data_grid.build(),
-    excel_export_mode=ExcelExportMode.MANUAL,
-    allow_unsafe_jscode=True,
-    custom_css={
-        "#gridToolBar": {
-            "padding-bottom": "0px !important",
-        }
-    },
+st.header("Cleaned columns")
+render_paged_grid(match_table, key="match_data.clean", pretty_columns=True)
+
+# Robots whose scouts disagreed too much for their consensus to be trusted
+consensus: pd.DataFrame = data_store.query_match_consensus(
+    events=[event.lower()],
+    teams=[team_number] if team_number else None,
+    matches=match_selection or None,
+    columns=["match.number", "team.number", SCOUTS_COLUMN, SPREAD_COLUMN, DISPUTED_COLUMN],
 )
+disputed: pd.DataFrame = consensus[consensus[DISPUTED_COLUMN]].drop(columns=[DISPUTED_COLUMN])
+if len(disputed):
+    with st.expander(f"Scout Disagreements ({len(disputed)})"):
+        st.write(
+            "Robots scouted by several scouts whose counts disagree. Their statistics use the "
+            "median of the scouts, weighted by how reliable every scout has been."
+        )
+        st.dataframe(prettify_columns(disputed), hide_index=True, use_container_width=True)
 
-column_names_original = match_data.columns
-column_names_pretty = {}
-for key in match_data.columns:
-    column_names_pretty[key] = ' '.join([word.capitalize() for word in key.split('.')])
-
-match_data_pretty = match_data.rename(columns=column_names_pretty)
+if team_number:
+    # Aggregated once for every chart, which only get the rows they show
+    breakdown: pd.DataFrame = get_team_breakdown(
+        data_store.query_match_consensus(
+            events=[event.lower()], teams=[team_number], matches=match_selection or None
+        )
+    )
 
-st.header("Cleaned columns")
-clean_data_grid = GridOptionsBuilder.from_dataframe(match_data_pretty)
-clean_data_grid.configure_pagination(enabled=True, paginationPageSize=10)
-clean_data_grid.configure_default_column(groupable="true", filterable="true")
-clean_data_grid.configure_grid_options(alwaysShowHorizontalScroll=True)
-clean_data_grid.configure_side_bar(filters_panel=True)
-
-AgGrid(
-    match_data_pretty,
-    gridOptions=clean_data_grid.build(),
-    excel_export_mode=ExcelExportMode.MANUAL,
-    allow_unsafe_jscode=True,
-    custom_css={
-        "#gridToolBar": {
-            "padding-bottom": "0px !important",
+    # Rolled up by the data store when the data was loaded, one row per team
+    summary: pd.DataFrame = pd.DataFrame(
+        {
+            statistic.capitalize(): data_store.get_team_rollup(event.lower(), statistic).loc[
+                team_number
+            ]
+            for statistic in ROLLUP_STATISTICS
         }
-    },
-)
+    )
+    with st.expander("Summary", expanded=True):
+        st.dataframe(summary.rename(index=get_pretty_column_name), use_container_width=True)
 
-if team_number:
-    with st.expander("Autonomous", expanded=True):    
-        for column in [
-                    "Amp Auto Average",
-                    "Subwoofer Auto Average",
-                    "Podium Auto Average",
-                    "Midfield Auto Average",
-                ]:
-            st.header(column)
-            st.bar_chart(data=match_data_pretty[["Match Number", column]], x="Match Number")
-
-
-    with st.expander("Teleop", expanded=True):    
-        for column in [
-                    "Amp Teleop Average",
-                    "Subwoofer Teleop Average",
-                    "Podium Teleop Average",
-                    "Medium Teleop Average",
-                    "Midfield Teleop Average",
-                ]:
-            st.subheader(column)
-            st.bar_chart(data=match_data_pretty[["Match Number", column]], x="Match Number")
+    with st.expander("Points", expanded=True):
+        st.altair_chart(get_points_chart(breakdown))
+
+    for period in [period for period in SCORING_PERIODS if period in SHOOTING_LOCATIONS]:
+        with st.expander(PERIOD_TITLES[period], expanded=True):
+            st.altair_chart(get_period_chart(breakdown, period))
@@ -3,32 +3,89 @@ import streamlit as st
 
 from typing import List
 
-match_data: pd.DataFrame = pd.DataFrame()
+from data_store import get_data_store
+from predictions import get_team_samples, simulate_match
+from scoring import SCORING_PERIODS, get_points_column
+
+st.set_page_config(
+    page_title="Match Predictions",
+    layout="wide",
+)
+st.title("Match Predictions")
+
+data_store = get_data_store()
 
 column1, column2, column3 = st.columns(3)
 
 event: str = ""
-red_alliance: List[str] = []
-blue_alliance: List[str] = []
+red_alliance: List[int] = []
+blue_alliance: List[int] = []
 
 with column1:
     event = st.selectbox(
-        label="Select the Event", options=match_data["event"].drop_duplicates().sort_values()
+        label="Select the Event", options=data_store.get_events(), format_func=str.capitalize
     )
 
 with column2:
     red_alliance = st.multiselect(
         label="Select the Red Alliance teams",
-        options=match_data[match_data["event"] == event]["team_number"]
-        .drop_duplicates()
-        .sort_values(),
+        options=data_store.get_teams(event) if event else [],
         max_selections=3,
     )
 with column3:
     blue_alliance = st.multiselect(
         label="Select the Blue Alliance teams",
-        options=match_data[match_data["event"] == event]["team_number"]
-        .drop_duplicates()
-        .sort_values(),
+        options=data_store.get_teams(event) if event else [],
         max_selections=3,
     )
+
+if not event or len(red_alliance) != 3 or len(blue_alliance) != 3:
+    st.write(
+        "Please select an event, three teams for the Red Alliance, and three teams for the Blue "
+        "Alliance."
+    )
+else:
+    match_data: pd.DataFrame = data_store.query_match_consensus(
+        events=[event], teams=red_alliance + blue_alliance
+    )
+    prediction = simulate_match(get_team_samples(match_data), red_alliance, blue_alliance)
+
+    if prediction.unscouted_teams:
+        st.warning(
+            "No matches were scouted for "
+            + ", ".join(str(team) for team in prediction.unscouted_teams)
+            + ", so they are predicted to score nothing."
+        )
+
+    column1, column2, column3 = st.columns(3)
+    with column1:
+        st.metric(label="Red Alliance wins", value=f"{prediction.red_win_probability:.0%}")
+        st.metric(label="Expected Red score", value=f"{prediction.red_scores.mean():.1f}")
+    with column2:
+        st.metric(label="Blue Alliance wins", value=f"{prediction.blue_win_probability:.0%}")
+        st.metric(label="Expected Blue score", value=f"{prediction.blue_scores.mean():.1f}")
+    with column3:
+        st.metric(label="Tie", value=f"{prediction.tie_probability:.0%}")
+
+    st.header("Score Distribution")
+    st.bar_chart(data=prediction.get_score_distribution(), color=["#d62728", "#1f77b4"])
+
+    st.header("Expected Points by Period")
+    period_names: List[str] = [period.capitalize() for period in SCORING_PERIODS]
+    st.dataframe(
+        pd.DataFrame(
+            [prediction.red_points.mean(axis=0), prediction.blue_points.mean(axis=0)],
+            index=["Red", "Blue"],
+            columns=period_names,
+        ),
+        use_container_width=True,
+    )
+
+    for alliance_name, alliance in [("Red", red_alliance), ("Blue", blue_alliance)]:
+        st.header(f"{alliance_name} Alliance Stats", divider=True)
+        team_points: pd.DataFrame = (
+            match_data[match_data["team.number"].isin(alliance)]
+            .groupby("team.number")[[get_points_column(period) for period in SCORING_PERIODS]]
+            .agg(["mean", "std", "count"])
+        )
+        st.dataframe(team_points, use_container_width=True)
@@ -3,12 +3,20 @@ import streamlit as st
 import pandas as pd
 import os
 
-from st_aggrid import AgGrid, GridOptionsBuilder
-from st_aggrid.shared import ExcelExportMode
+from data_grid import render_grid
+from data_store import get_data_store
 
-from query_data import load_tba_opr_data, load_tba_opr_options
+data_store = get_data_store()
 
-event_options: List[str] = load_tba_opr_options()
+source: str = st.radio(
+    label="Select the Source", options=["The Blue Alliance", "Scouting Data"], horizontal=True
+)
+
+event_options: List[str] = (
+    data_store.get_tba_opr_options()
+    if source == "The Blue Alliance"
+    else [event.capitalize() for event in data_store.get_events()]
+)
 event: str = ""
 
 event = st.selectbox(
@@ -16,22 +24,16 @@ event = st.selectbox(
 )
 
 if event:
-    data = load_tba_opr_data(event=event)
-    st.header("TBA COPRs")
-
-    data_grid = GridOptionsBuilder.from_dataframe(data)
-    data_grid.configure_pagination(enabled=True, paginationPageSize=10)
-    data_grid.configure_default_column(groupable="true", filterable="true")
-    data_grid.configure_grid_options(alwaysShowHorizontalScroll=True)
-    data_grid.configure_side_bar(filters_panel=True)
+    if source == "The Blue Alliance":
+        statistic: str = st.radio(
+            label="Show", options=["value", "rank", "percentile"], horizontal=True,
+            format_func=lambda option: option.capitalize() + "s",
+        )
+        data = data_store.get_tba_opr_data(event=event, statistic=statistic)
+        st.header("TBA COPRs")
+    else:
+        # Computed at the venue from our own scouting, so it stays current without internet access
+        data = data_store.get_scouting_opr_data(event=event.lower())
+        st.header("Scouting COPRs")
 
-    AgGrid(data,
-        gridOptions=data_grid.build(),
-        excel_export_mode=ExcelExportMode.MANUAL,
-        allow_unsafe_jscode=True,
-        custom_css={
-            "#gridToolBar": {
-                "padding-bottom": "0px !important",
-            }
-        },
-    )
\ No newline at end of file
+    render_grid(data)
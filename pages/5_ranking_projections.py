@@ -0,0 +1,59 @@
+from typing import Optional
+import pandas as pd
+import streamlit as st
+
+from data_store import get_data_store
+from predictions import get_team_samples
+from query_data import SCHEDULE_FILE, load_match_schedule
+from schedule import SEASON_COUNT, project_rankings
+
+st.set_page_config(
+    page_title="Ranking Projections",
+    layout="wide",
+)
+st.title("Ranking Projections")
+st.write(
+    "Simulates the rest of the qualification schedule with every team's scouted matches "
+    "to project the final rankings."
+)
+
+data_store = get_data_store()
+
+column1, column2 = st.columns(2)
+
+with column1:
+    event: str = st.selectbox(
+        label="Select the Event", options=data_store.get_events(), format_func=str.capitalize
+    )
+with column2:
+    season_count: int = st.select_slider(
+        label="Simulated seasons",
+        options=[500, 1_000, SEASON_COUNT, 5_000, 10_000],
+        value=SEASON_COUNT,
+    )
+
+schedule: Optional[pd.DataFrame] = load_match_schedule(event) if event else None
+
+if schedule is None:
+    st.write(
+        f"Add the qualification schedule of the event to `data/{event}/{SCHEDULE_FILE}`, with the "
+        "columns `match.number`, `red.1`, `red.2`, `red.3`, `blue.1`, `blue.2`, `blue.3`, "
+        "`red.score` and `blue.score` (leave the scores empty for matches not played yet)."
+    )
+else:
+    match_data: pd.DataFrame = data_store.query_match_consensus(events=[event])
+    rankings: pd.DataFrame = project_rankings(schedule, get_team_samples(match_data), season_count)
+
+    played: int = int(schedule[["red.score", "blue.score"]].notna().all(axis=1).sum())
+    st.write(f"{played} of {len(schedule)} qualification matches played.")
+
+    top_eight: pd.Series = rankings.loc[:, 1:8].sum(axis=1).rename("Top 8")
+    st.header("Projected Rankings")
+    st.dataframe(
+        pd.concat([rankings["Expected Rank"], top_eight], axis=1),
+        use_container_width=True,
+        column_config={"Top 8": st.column_config.ProgressColumn(format="%.2f", max_value=1)},
+    )
+
+    st.header("Rank Distribution")
+    st.bar_chart(rankings.drop(columns=["Expected Rank"]).T.rename_axis("Rank"))
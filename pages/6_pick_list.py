@@ -0,0 +1,102 @@
+from typing import Dict, List
+import pandas as pd
+import streamlit as st
+
+from data_store import get_data_store
+from pick_list import (
+    ALLIANCE_SIZE,
+    COVERAGE_WEIGHTS,
+    SUM_WEIGHTS,
+    build_team_features,
+    rank_alliances,
+    rank_next_picks,
+)
+
+st.set_page_config(
+    page_title="Pick List",
+    layout="wide",
+)
+st.title("Pick List")
+st.write(
+    "Ranks every alliance that can still be built, from the average points of every team and the "
+    "capabilities the alliance needs only one robot for. Update the picks as alliance selection "
+    "goes to keep the list current."
+)
+
+data_store = get_data_store()
+
+event: str = st.selectbox(
+    label="Select the Event", options=data_store.get_events(), format_func=str.capitalize
+)
+
+features: pd.DataFrame = build_team_features(
+    data_store.get_team_rollup(event, "mean"), data_store.query_pit_scouting(events=[event])
+)
+teams: List[int] = features.index.tolist()
+
+column1, column2 = st.columns(2)
+
+with column1:
+    picked: List[int] = st.multiselect(
+        label="Our alliance (captain first)", options=teams, max_selections=ALLIANCE_SIZE
+    )
+with column2:
+    unavailable: List[int] = st.multiselect(
+        label="Teams already on other alliances",
+        options=[team for team in teams if team not in picked],
+    )
+
+with st.expander("Weights"):
+    weight_columns = st.columns(len(SUM_WEIGHTS) + len(COVERAGE_WEIGHTS))
+    sum_weights: Dict[str, float] = {}
+    coverage_weights: Dict[str, float] = {}
+    for column, (feature, weight) in zip(weight_columns, SUM_WEIGHTS.items()):
+        with column:
+            sum_weights[feature] = st.number_input(
+                label=" ".join(word.capitalize() for word in feature.split(".")),
+                value=weight,
+                step=0.5,
+            )
+    for column, (feature, weight) in zip(
+        weight_columns[len(SUM_WEIGHTS) :], COVERAGE_WEIGHTS.items()
+    ):
+        with column:
+            coverage_weights[feature] = st.number_input(
+                label=" ".join(word.capitalize() for word in feature.split(".")) + " (points)",
+                value=weight,
+                step=1.0,
+            )
+
+column1, column2 = st.columns(2)
+
+with column1:
+    st.header("Best Alliances")
+    st.dataframe(
+        rank_alliances(
+            features,
+            picked,
+            unavailable,
+            sum_weights=sum_weights,
+            coverage_weights=coverage_weights,
+        ),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+with column2:
+    if picked and len(picked) < ALLIANCE_SIZE:
+        st.header("Best Next Picks")
+        st.dataframe(
+            rank_next_picks(
+                features,
+                picked,
+                unavailable,
+                sum_weights=sum_weights,
+                coverage_weights=coverage_weights,
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+st.header("Team Features")
+st.dataframe(features.drop(index=unavailable), use_container_width=True)
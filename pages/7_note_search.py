@@ -0,0 +1,49 @@
+import time
+from typing import List
+import pandas as pd
+import streamlit as st
+
+from data_grid import prettify_columns
+from data_store import get_data_store
+from note_search import NOTE_COLUMNS
+
+st.set_page_config(
+    page_title="Note Search",
+    layout="wide",
+)
+st.title("Note Search")
+st.write(
+    "Searches the notes left by the scouters in the match and pit scouting of every event. "
+    'Put phrases between double quotes, e.g. `"note stuck" defence`.'
+)
+
+data_store = get_data_store()
+
+column1, column2, column3 = st.columns([3, 1, 2])
+
+with column1:
+    search: str = st.text_input(label="Search")
+with column2:
+    kinds: List[str] = st.multiselect(
+        label="Scouting",
+        options=list(NOTE_COLUMNS),
+        default=list(NOTE_COLUMNS),
+        format_func=str.capitalize,
+    )
+with column3:
+    events: List[str] = st.multiselect(
+        label="Events", options=data_store.get_events(), format_func=str.capitalize
+    )
+
+if search.strip():
+    start: float = time.perf_counter()
+    hits: pd.DataFrame = data_store.search_notes(search, kinds=kinds, events=events or None)
+    elapsed: float = time.perf_counter() - start
+
+    st.caption(f"{len(hits)} notes found in {elapsed * 1000:.1f} ms")
+    st.dataframe(
+        prettify_columns(hits),
+        hide_index=True,
+        use_container_width=True,
+        column_config={"Score": st.column_config.NumberColumn(format="%.2f")},
+    )
@@ -0,0 +1,61 @@
+from typing import Optional
+import pandas as pd
+import streamlit as st
+
+from data_grid import prettify_columns
+from data_store import get_data_store
+from team_history import ROLLING_WINDOW, get_rolling_column, get_trend_column
+
+st.set_page_config(
+    page_title="Team History",
+    layout="wide",
+)
+st.title("Team History")
+st.write(
+    "Follows every team across every event of the season. Rolling averages and trends are over "
+    f"the last {ROLLING_WINDOW} matches of a team, and trends are in points per match."
+)
+
+data_store = get_data_store()
+form: pd.DataFrame = data_store.get_team_form()
+
+team_number: Optional[int] = st.selectbox(
+    label="Select Team Number", options=form.index.tolist(), index=None
+)
+
+if team_number:
+    history: pd.DataFrame = data_store.get_team_history(team_number)
+    latest: pd.Series = form.loc[team_number]
+
+    column1, column2, column3, column4 = st.columns(4)
+    with column1:
+        st.metric("Matches", int(latest["matches"]))
+    with column2:
+        st.metric("Events", int(latest["events"]))
+    with column3:
+        st.metric(
+            f"Total Points (last {ROLLING_WINDOW})",
+            f"{latest[get_rolling_column('total.points')]:.1f}",
+        )
+    with column4:
+        st.metric("Total Points Trend", f"{latest[get_trend_column('total.points')]:+.1f}")
+
+    st.header("Season Trajectory")
+    trajectory: pd.DataFrame = history.set_index("sequence")[
+        ["total.points", get_rolling_column("total.points")]
+    ]
+    st.line_chart(
+        prettify_columns(trajectory).rename_axis("Match"),
+    )
+
+    st.header("Matches")
+    st.dataframe(prettify_columns(history), hide_index=True, use_container_width=True)
+
+st.header("Season Form")
+st.dataframe(
+    prettify_columns(
+        form.sort_values(by=get_rolling_column("total.points"), ascending=False).reset_index()
+    ),
+    hide_index=True,
+    use_container_width=True,
+)
@@ -0,0 +1,68 @@
+from typing import Dict, Optional
+import pandas as pd
+import streamlit as st
+
+from data_grid import prettify_columns
+from data_store import get_data_store
+from query_data import load_validation_report
+
+st.set_page_config(
+    page_title="Data Quality",
+    layout="wide",
+)
+st.title("Data Quality")
+st.write(
+    "Every export is checked when it is loaded. Use this page to find the exports and the scouts "
+    "whose rows need a second look."
+)
+
+event: str = st.selectbox(
+    label="Select the Event", options=get_data_store().get_events(), format_func=str.capitalize
+)
+report: Optional[dict] = load_validation_report(event) if event else None
+
+
+def to_issue_table(groups: Dict[str, dict], rules: Dict[str, str], name: str) -> pd.DataFrame:
+    """
+    One row per export or scout of the report, with its rows and its issues for every rule.
+    """
+    table = pd.DataFrame(
+        [
+            {name: group, "Rows": entry["rows"], **entry["issues"]}
+            for group, entry in groups.items()
+        ],
+        columns=[name, "Rows", *rules],
+    )
+    table[list(rules)] = table[list(rules)].fillna(0).astype(int)
+    table.insert(2, "Issues", table[list(rules)].sum(axis=1))
+    return table.sort_values(by="Issues", ascending=False)
+
+
+if report is None:
+    st.write("This event has not been validated yet. Run `python etl.py` to validate it.")
+else:
+    with st.expander("Rules"):
+        for rule, description in report["rules"].items():
+            st.write(f"- `{rule}`: {description}")
+
+    column1, column2 = st.columns(2)
+    with column1:
+        st.header("Exports")
+        st.dataframe(
+            to_issue_table(report["files"], report["rules"], "Export"),
+            hide_index=True,
+            use_container_width=True,
+        )
+    with column2:
+        st.header("Scouts")
+        st.dataframe(
+            to_issue_table(report["scouts"], report["rules"], "Scout"),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+    st.header("Rows with Issues")
+    rows = pd.DataFrame(report["rows"])
+    if not rows.empty:
+        rows["rules"] = rows["rules"].str.join(", ")
+    st.dataframe(prettify_columns(rows), hide_index=True, use_container_width=True)
@@ -0,0 +1,153 @@
+import heapq
+import itertools
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from scoring import SCORING_PERIODS, get_points_column
+
+# Robots on an alliance during the playoffs
+ALLIANCE_SIZE: int = 3
+
+# Average points of every period. An alliance scores the sum of the points of its robots.
+SUM_WEIGHTS: Dict[str, float] = {get_points_column(period): 1.0 for period in SCORING_PERIODS}
+
+# Capabilities an alliance only needs one robot to have, with the points they are worth to it
+COVERAGE_WEIGHTS: Dict[str, float] = {"robot.under.stage": 5.0}
+
+
+def build_team_features(team_means: pd.DataFrame, pit_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Features of every team scouted at an event, indexed by team number: its average points in
+    every period from the rolled up match data (see `ScoutingDataStore.get_team_rollup`), and its
+    capabilities (1 or 0) from the pit data.
+    """
+    points: pd.DataFrame = team_means.reindex(columns=list(SUM_WEIGHTS)).astype(np.float64)
+    points.index = points.index.astype(int)
+
+    # Keep the latest answer of every team, when it was pit scouted more than once
+    pit_data = pit_data.dropna(subset=["team.number"])
+    if "timestamp" in pit_data.columns:
+        pit_data = pit_data.sort_values(by="timestamp")
+    capabilities: pd.DataFrame = (
+        pit_data.drop_duplicates(subset="team.number", keep="last")
+        .set_index(pit_data["team.number"].drop_duplicates(keep="last").astype(int))
+        .reindex(columns=list(COVERAGE_WEIGHTS))
+        .eq("Yes")
+        .astype(np.float64)
+    )
+
+    features: pd.DataFrame = points.join(capabilities, how="outer").fillna(0)
+    features.index.name = "team.number"
+    return features
+
+
+def _get_combinations(count: int, size: int) -> np.ndarray:
+    """
+    Every combination of `size` positions out of `count`, as a (combinations, size) array.
+    """
+    if size == 0:
+        return np.zeros((1, 0), dtype=np.int64)
+    flat: np.ndarray = np.fromiter(
+        itertools.chain.from_iterable(itertools.combinations(range(count), size)), dtype=np.int64
+    )
+    return flat.reshape(-1, size)
+
+
+def _score_alliances(
+    features: pd.DataFrame,
+    picked: Optional[List[int]],
+    unavailable: Optional[List[int]],
+    sum_weights: Dict[str, float],
+    coverage_weights: Dict[str, float],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Score every alliance that includes every `picked` team, completed with teams that are neither
+    picked nor `unavailable`.
+
+    The features of the robots of every alliance are gathered into one
+    (alliances, robots, features) array, then summed or maxed over the robots and weighted.
+
+    Returns:
+        The team numbers, the (alliances, robots) positions in them of every alliance, and the
+        score of every alliance.
+    """
+    picked = [team for team in (picked or []) if team in features.index]
+    excluded: set = set(picked) | set(unavailable or [])
+    candidates: List[int] = [team for team in features.index.tolist() if team not in excluded]
+
+    teams: np.ndarray = np.array(picked + candidates, dtype=np.int64)
+    values: np.ndarray = features.reindex(
+        index=teams, columns=[*sum_weights, *coverage_weights]
+    ).to_numpy(dtype=np.float64, na_value=0)
+
+    open_slots: int = min(ALLIANCE_SIZE - len(picked), len(candidates))
+    combinations: np.ndarray = _get_combinations(len(candidates), open_slots) + len(picked)
+    alliances: np.ndarray = np.hstack(
+        [np.broadcast_to(np.arange(len(picked)), (len(combinations), len(picked))), combinations]
+    ).astype(np.int64)
+
+    robots: np.ndarray = values[alliances]
+    sum_count: int = len(sum_weights)
+    scores: np.ndarray = robots[..., :sum_count].sum(axis=1) @ np.array(
+        list(sum_weights.values())
+    ) + robots[..., sum_count:].max(axis=1, initial=0) @ np.array(list(coverage_weights.values()))
+    return teams, alliances, scores
+
+
+def rank_alliances(
+    features: pd.DataFrame,
+    picked: Optional[List[int]] = None,
+    unavailable: Optional[List[int]] = None,
+    top_k: int = 25,
+    sum_weights: Dict[str, float] = SUM_WEIGHTS,
+    coverage_weights: Dict[str, float] = COVERAGE_WEIGHTS,
+) -> pd.DataFrame:
+    """
+    The `top_k` best alliances that include every `picked` team, completed with teams that are
+    neither picked nor `unavailable` (e.g. already on another alliance). Every candidate alliance
+    is scored at once, and the best ones are kept with a heap instead of sorting them all.
+
+    Returns:
+        One row per alliance, best first, with its teams in `Team 1` to `Team 3` and its expected
+        score in `Score`.
+    """
+    teams, alliances, scores = _score_alliances(
+        features, picked, unavailable, sum_weights, coverage_weights
+    )
+
+    best: List[int] = heapq.nlargest(top_k, range(len(scores)), key=scores.__getitem__)
+    result = pd.DataFrame(
+        teams[alliances[best]].reshape(len(best), alliances.shape[1]),
+        columns=[f"Team {slot + 1}" for slot in range(alliances.shape[1])],
+    )
+    result["Score"] = scores[best]
+    return result
+
+
+def rank_next_picks(
+    features: pd.DataFrame,
+    picked: List[int],
+    unavailable: Optional[List[int]] = None,
+    sum_weights: Dict[str, float] = SUM_WEIGHTS,
+    coverage_weights: Dict[str, float] = COVERAGE_WEIGHTS,
+) -> pd.DataFrame:
+    """
+    Every available team, with the score of the best alliance it completes with the `picked`
+    teams, best first.
+    """
+    teams, alliances, scores = _score_alliances(
+        features, picked, unavailable, sum_weights, coverage_weights
+    )
+    picked_count: int = len([team for team in picked if team in features.index])
+
+    # Best score of every team over the alliances it completes
+    open_slots: np.ndarray = alliances[:, picked_count:]
+    best_scores: np.ndarray = np.full(len(teams), -np.inf)
+    np.maximum.at(best_scores, open_slots.ravel(), np.repeat(scores, open_slots.shape[1]))
+
+    result = pd.DataFrame(
+        {"Team Number": teams[picked_count:], "Best Alliance Score": best_scores[picked_count:]}
+    )
+    result = result[np.isfinite(result["Best Alliance Score"])]
+    return result.sort_values(by="Best Alliance Score", ascending=False).reset_index(drop=True)
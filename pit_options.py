@@ -0,0 +1,99 @@
+import re
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# Multiple choice questions of the pit scouting, exported as `[first, second]`
+PIT_LIST_COLUMNS: List[str] = [
+    "robot.drive.motors",
+    "robot.mechanism.motors",
+    "robot.intake.method",
+    "robot.vision.software",
+    "robot.vision.cameras",
+    "robot.auto.software",
+]
+
+# Columns of the pit data every parsed answer keeps, to find its team
+PIT_KEY_COLUMNS: List[str] = ["event", "team.number"]
+
+# One answer of a list. Answers can themselves contain commas between parentheses, e.g.
+# `Brushed (CIM, Mini CIM, 775, etc)`, so those are kept whole.
+LIST_ITEM_PATTERN = re.compile(r"(?:[^,()\[\]]|\([^)]*\))+")
+
+
+def parse_list_field(value: Optional[str]) -> List[str]:
+    """
+    Answers of a multiple choice question, from `[first, second]`. No answers when it was left
+    empty or unanswered.
+    """
+    if not isinstance(value, str):
+        return []
+    return [item.strip() for item in LIST_ITEM_PATTERN.findall(value) if item.strip()]
+
+
+def explode_list_columns(
+    pit_data: pd.DataFrame, columns: List[str] = PIT_LIST_COLUMNS
+) -> pd.DataFrame:
+    """
+    Parse the multiple choice answers of the pit data once, into a child table with one row per
+    answer. Few distinct answers are ever given, so every distinct string is only parsed once.
+
+    Returns:
+        The columns `row` (position of the answer's record in `pit_data`), `event`,
+        `team.number`, `column` (the question) and `value` (the answer), in the order of the
+        records and of the answers.
+    """
+    parts: List[pd.DataFrame] = []
+    for column in [column for column in columns if column in pit_data.columns]:
+        values: np.ndarray = pit_data[column].to_numpy(dtype=object, na_value=None)
+        parsed: Dict[Optional[str], List[str]] = {
+            value: parse_list_field(value) for value in pd.unique(values)
+        }
+        answers: List[List[str]] = [parsed[value] for value in values]
+        counts: np.ndarray = np.fromiter(map(len, answers), dtype=np.int64, count=len(answers))
+        rows: np.ndarray = np.repeat(np.arange(len(pit_data)), counts)
+        part = pit_data.reindex(columns=PIT_KEY_COLUMNS).iloc[rows].reset_index(drop=True)
+        part.insert(0, "row", rows)
+        part["column"] = column
+        part["value"] = [answer for record in answers for answer in record]
+        parts.append(part)
+
+    if not parts:
+        return pd.DataFrame(columns=["row", *PIT_KEY_COLUMNS, "column", "value"])
+    return pd.concat(parts, ignore_index=True)
+
+
+def build_option_matrix(lists: pd.DataFrame, pit_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Multi-hot matrix of the answers parsed by `explode_list_columns`: one row per record of
+    `pit_data`, indexed by (event, team.number), and one boolean column per (question, answer),
+    True when the answer was given. Filtering teams on their answers is then an AND of columns.
+    """
+    options: pd.MultiIndex = pd.MultiIndex.from_frame(
+        lists[["column", "value"]].drop_duplicates().sort_values(by=["column", "value"])
+    )
+    matrix: np.ndarray = np.zeros((len(pit_data), len(options)), dtype=bool)
+    matrix[
+        lists["row"].to_numpy(dtype=np.int64),
+        options.get_indexer(pd.MultiIndex.from_frame(lists[["column", "value"]])),
+    ] = True
+
+    return pd.DataFrame(
+        matrix,
+        index=pd.MultiIndex.from_frame(pit_data.reindex(columns=PIT_KEY_COLUMNS)),
+        columns=options,
+    )
+
+
+def match_options(options: pd.DataFrame, required: Dict[str, List[str]]) -> np.ndarray:
+    """
+    Rows of an option matrix (see `build_option_matrix`) with every `required` answer of every
+    question, e.g. `{"robot.intake.method": ["Over-the-Bumper"]}`.
+    """
+    mask: np.ndarray = np.ones(len(options), dtype=bool)
+    for column, values in required.items():
+        for value in values:
+            if (column, value) not in options.columns:
+                return np.zeros(len(options), dtype=bool)
+            mask &= options[(column, value)].to_numpy()
+    return mask
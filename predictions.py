@@ -0,0 +1,119 @@
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+
+from scoring import SCORING_PERIODS, get_points_column
+
+# Number of matches simulated for every prediction
+SIMULATION_COUNT: int = 10_000
+
+
+def get_team_samples(
+    match_data: pd.DataFrame, periods: List[str] = SCORING_PERIODS
+) -> Dict[int, np.ndarray]:
+    """
+    Points scored by every team in each of its scouted matches, as a (matches, periods) array
+    per team. A robot scouted more than once in a match counts with its average.
+    """
+    columns: List[str] = [get_points_column(period) for period in periods]
+    rows: pd.DataFrame = match_data.dropna(subset=["team.number", "match.number"])
+    points: pd.DataFrame = (
+        rows.reindex(columns=columns)
+        .astype(np.float64)
+        .fillna(0)
+        .groupby([rows["team.number"].astype(int), rows["match.number"].astype(int)])
+        .mean()
+    )
+    return {
+        int(team): points.to_numpy()[positions]
+        for team, positions in points.groupby(level=0).indices.items()
+    }
+
+
+class MatchPrediction(NamedTuple):
+    """
+    Outcome of simulating a match between two alliances many times.
+    """
+
+    # Points of every simulated match, as (simulations, periods) arrays
+    red_points: np.ndarray
+    blue_points: np.ndarray
+    # Teams without any scouted match, simulated as scoring nothing
+    unscouted_teams: List[int]
+
+    @property
+    def red_scores(self) -> np.ndarray:
+        return self.red_points.sum(axis=1)
+
+    @property
+    def blue_scores(self) -> np.ndarray:
+        return self.blue_points.sum(axis=1)
+
+    @property
+    def red_win_probability(self) -> float:
+        return float(np.mean(self.red_scores > self.blue_scores))
+
+    @property
+    def blue_win_probability(self) -> float:
+        return float(np.mean(self.blue_scores > self.red_scores))
+
+    @property
+    def tie_probability(self) -> float:
+        return float(np.mean(self.red_scores == self.blue_scores))
+
+    def get_score_distribution(self) -> pd.DataFrame:
+        """
+        Share of the simulated matches ending with every score, with a `Red` and a `Blue` column
+        indexed by score.
+        """
+        red_scores: np.ndarray = np.rint(self.red_scores).astype(np.int64)
+        blue_scores: np.ndarray = np.rint(self.blue_scores).astype(np.int64)
+        length: int = int(max(red_scores.max(initial=0), blue_scores.max(initial=0))) + 1
+        return pd.DataFrame(
+            {
+                "Red": np.bincount(red_scores, minlength=length) / len(red_scores),
+                "Blue": np.bincount(blue_scores, minlength=length) / len(blue_scores),
+            },
+            index=pd.RangeIndex(length, name="Score"),
+        )
+
+
+def simulate_match(
+    team_samples: Dict[int, np.ndarray],
+    red_alliance: List[int],
+    blue_alliance: List[int],
+    simulation_count: int = SIMULATION_COUNT,
+    seed: Optional[int] = None,
+) -> MatchPrediction:
+    """
+    Simulate a match by drawing the points of every robot from one of its scouted matches, for
+    every simulation at once.
+
+    The scouted matches of all teams are padded into one (teams, matches, periods) array, so the
+    draws of every robot of every simulation are a single random array and a single gather.
+    """
+    teams: List[int] = [*red_alliance, *blue_alliance]
+    unscouted_teams: List[int] = [team for team in teams if len(team_samples.get(team, [])) == 0]
+    period_count: int = next(
+        (samples.shape[1] for samples in team_samples.values()), len(SCORING_PERIODS)
+    )
+
+    # Unscouted teams get a single match where they score nothing
+    samples: List[np.ndarray] = [
+        team_samples[team] if team not in unscouted_teams else np.zeros((1, period_count))
+        for team in teams
+    ]
+    counts: np.ndarray = np.array([len(team_points) for team_points in samples])
+    padded: np.ndarray = np.zeros((len(teams), counts.max(), period_count))
+    for position, team_points in enumerate(samples):
+        padded[position, : len(team_points)] = team_points
+
+    rng = np.random.default_rng(seed)
+    draws: np.ndarray = (rng.random((simulation_count, len(teams))) * counts).astype(np.int64)
+    points: np.ndarray = padded[np.arange(len(teams)), draws]
+
+    return MatchPrediction(
+        red_points=points[:, : len(red_alliance)].sum(axis=1),
+        blue_points=points[:, len(red_alliance) :].sum(axis=1),
+        unscouted_teams=unscouted_teams,
+    )
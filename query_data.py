@@ -1,94 +1,551 @@
+import hashlib
 import os
-from typing import List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
 import json
 
+from schema import ROW_KEY_COLUMNS, get_row_keys, to_pandas
+from seasons import read_season_export
+
+# Compiled Arrow IPC copies of the raw CSV exports live here, mirroring `data/<event>/raw/<kind>`
+CACHE_PATH: str = os.path.join(".cache", "scouting")
+
+# Bump whenever the way a raw CSV is parsed changes, so stale cache entries get rebuilt
+CACHE_VERSION: int = 4
+
+# Kinds of scouting exported by the tablets, each in its own `data/<event>/raw/<kind>` folder
+SCOUTING_KINDS: List[str] = ["match", "pit"]
+
+# The ETL (see `etl.py`) writes the cleaned data of each event to `data/<event>/filtered`
+FILTERED_FOLDER: str = "filtered"
+
+# Quality report of the match scouting of each event (see `validation.py`), written by the ETL
+VALIDATION_FILE: str = "validation.json"
+
+# Dumps of the OPRs and COPRs published by The Blue Alliance, one `<event>.json` per event
+TBA_OPR_PATH: str = "tba_oprs"
+
+# Qualification schedule of an event, with a row per match, in `data/<event>/schedule.csv`
+SCHEDULE_FILE: str = "schedule.csv"
+
+# Columns of the per-file timing report returned by `load_raw_scouting_files`
+LOAD_REPORT_COLUMNS: List[str] = [
+    "event",
+    "source",
+    "rows",
+    "bytes",
+    "cached",
+    "seconds",
+    "sha256",
+    "duplicate_of",
+]
+
+
+def list_raw_scouting_files(kind: str, events: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    """
+    List every raw CSV export for the given kind of scouting ("match" or "pit") as
+    `(event, file_path)` pairs, in a stable order. Events without a folder for that kind are
+    skipped.
+    """
+    files: List[Tuple[str, str]] = []
+    for event in events if events is not None else get_events_available():
+        path: str = os.path.join("data", event, "raw", kind)
+        if not os.path.isdir(path):
+            continue
+        for file in sorted(os.listdir(path)):
+            if file.endswith(".csv"):
+                files.append((event, os.path.join(path, file)))
+    return files
+
+
+def _get_cache_paths(file_path: str) -> Tuple[str, str]:
+    """
+    Map `data/<event>/raw/<kind>/<file>.csv` to its compiled Arrow IPC file and the sidecar
+    JSON entry holding the signature of the CSV it was compiled from.
+    """
+    relative_path: str = os.path.relpath(file_path, "data")
+    base_path: str = os.path.join(CACHE_PATH, os.path.splitext(relative_path)[0])
+    return f"{base_path}.arrow", f"{base_path}.json"
+
+
+def _read_cache_entry(entry_path: str) -> dict:
+    try:
+        with open(entry_path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache_entry(entry: dict, entry_path: str) -> None:
+    try:
+        with open(f"{entry_path}.tmp", "w") as file:
+            json.dump(entry, file)
+        os.replace(f"{entry_path}.tmp", entry_path)
+    except OSError:
+        pass
+
+
+def _write_cache(table: pa.Table, entry: dict, arrow_path: str, entry_path: str) -> None:
+    """
+    Write the compiled Arrow IPC file, then its entry, each atomically. A read-only checkout
+    only loses the cache, not the data, so write failures are ignored.
+    """
+    try:
+        os.makedirs(os.path.dirname(arrow_path), exist_ok=True)
+        feather.write_feather(table, f"{arrow_path}.tmp", compression="uncompressed")
+        os.replace(f"{arrow_path}.tmp", arrow_path)
+    except OSError:
+        return
+    _write_cache_entry(entry, entry_path)
+
+
+def _parse_raw_scouting_file(kind: str, event: str, file_path: str, content: bytes) -> pa.Table:
+    table: pa.Table = read_season_export(content, kind)
+    for column, value in [("source", os.path.basename(file_path)), ("event", event)]:
+        table = table.append_column(
+            column, pa.array([value] * table.num_rows, pa.string()).dictionary_encode()
+        )
+    return table
+
+
+def _read_raw_scouting_file(
+    kind: str, event: str, file_path: str, use_cache: bool = True
+) -> Tuple[pa.Table, dict]:
+    """
+    Read a single raw CSV export, going through the Arrow IPC cache when possible.
+
+    A cache entry is reused as-is when the size and modification time of the CSV match its
+    signature. When only the modification time changed (e.g. a fresh checkout), the content
+    hash decides whether the compiled file is still valid. Otherwise the CSV is parsed and
+    compiled again.
+    """
+    start: float = time.perf_counter()
+    stat = os.stat(file_path)
+    arrow_path, entry_path = _get_cache_paths(file_path)
+    entry: dict = _read_cache_entry(entry_path) if use_cache else {}
+    is_entry_valid: bool = entry.get("version") == CACHE_VERSION and os.path.exists(arrow_path)
+
+    signature: Tuple[int, int] = (stat.st_size, stat.st_mtime_ns)
+    cached: bool = is_entry_valid and (entry["size"], entry["mtime_ns"]) == signature
+    if not cached:
+        with open(file_path, "rb") as file:
+            content: bytes = file.read()
+        sha256: str = hashlib.sha256(content).hexdigest()
+        cached = is_entry_valid and entry["sha256"] == sha256
+
+        if not cached:
+            table = _parse_raw_scouting_file(kind, event, file_path, content)
+
+        if use_cache:
+            entry = {
+                "path": file_path,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": sha256,
+                "version": CACHE_VERSION,
+            }
+            if cached:
+                _write_cache_entry(entry, entry_path)
+            else:
+                _write_cache(table, entry, arrow_path, entry_path)
+
+    else:
+        sha256 = entry["sha256"]
+
+    if cached:
+        table = feather.read_table(arrow_path, memory_map=False)
+
+    timing: dict = {
+        "event": event,
+        "source": os.path.basename(file_path),
+        "rows": table.num_rows,
+        "bytes": stat.st_size,
+        "cached": cached,
+        "seconds": time.perf_counter() - start,
+        "sha256": sha256,
+        "duplicate_of": None,
+    }
+    return table, timing
+
+
+def _get_file_hash(file_path: str) -> str:
+    """
+    The sha256 of a raw export, taken from its cache entry when the file is unchanged.
+
+    Otherwise the file is hashed and its entry updated, so duplicate exports, which are never
+    compiled, are not read again until they change. An entry whose compiled file no longer
+    matches the content loses its version, so the export is compiled again when it is read.
+    """
+    stat = os.stat(file_path)
+    entry_path: str = _get_cache_paths(file_path)[1]
+    entry: dict = _read_cache_entry(entry_path)
+    if (entry.get("size"), entry.get("mtime_ns")) == (stat.st_size, stat.st_mtime_ns):
+        return entry["sha256"]
+
+    with open(file_path, "rb") as file:
+        sha256: str = hashlib.sha256(file.read()).hexdigest()
+    if entry.get("sha256") != sha256:
+        entry = {"path": file_path}
+    entry.update({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256})
+    try:
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+    except OSError:
+        return sha256
+    _write_cache_entry(entry, entry_path)
+    return sha256
+
+
+def find_duplicate_raw_files(kind: str) -> Dict[str, str]:
+    """
+    Find raw exports whose content is byte-identical to another export of the same kind, across
+    every event (e.g. a pit export copied into the folder of another event).
+
+    Returns:
+        A mapping of every duplicate file path to the path of the first export (by event, then
+        file name) with the same content.
+    """
+    first_seen: Dict[str, str] = {}
+    duplicates: Dict[str, str] = {}
+    for _, file_path in list_raw_scouting_files(kind):
+        sha256: str = _get_file_hash(file_path)
+        if sha256 in first_seen:
+            duplicates[file_path] = first_seen[sha256]
+        else:
+            first_seen[sha256] = file_path
+    return duplicates
+
+
+def _load_raw_scouting_tables(
+    kind: str,
+    events: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    use_cache: bool = True,
+    skip_duplicate_files: bool = True,
+    duplicates: Optional[Dict[str, str]] = None,
+) -> Tuple[List[pa.Table], pd.DataFrame]:
+    files: List[Tuple[str, str]] = list_raw_scouting_files(kind, events)
+    if not skip_duplicate_files:
+        duplicates = {}
+    elif duplicates is None:
+        duplicates = find_duplicate_raw_files(kind)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(
+            executor.map(
+                lambda file: _read_raw_scouting_file(kind, *file, use_cache),
+                [file for file in files if file[1] not in duplicates],
+            )
+        )
+
+    tables: List[pa.Table] = [table for table, _ in results]
+    timings: List[dict] = [timing for _, timing in results]
+    for event, file_path in files:
+        if file_path in duplicates:
+            timings.append(
+                {
+                    "event": event,
+                    "source": os.path.basename(file_path),
+                    "rows": 0,
+                    "bytes": os.path.getsize(file_path),
+                    "cached": False,
+                    "seconds": 0.0,
+                    "sha256": _get_file_hash(file_path),
+                    "duplicate_of": duplicates[file_path],
+                }
+            )
+
+    report = pd.DataFrame(timings, columns=LOAD_REPORT_COLUMNS)
+    return tables, report
+
+
+def _to_dataframe(tables: List[pa.Table]) -> pd.DataFrame:
+    if not tables:
+        return pd.DataFrame(columns=["source", "event"])
+
+    # Concatenating in Arrow and converting once is much cheaper than concatenating the
+    # categoricals of every file in pandas
+    return to_pandas(pa.concat_tables(tables, promote_options="permissive"))
+
+
+def load_raw_scouting_files(
+    kind: str,
+    events: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    use_cache: bool = True,
+    skip_duplicate_files: bool = True,
+    duplicates: Optional[Dict[str, str]] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Read every raw CSV export for the given kind of scouting with a thread pool and
+    concatenate them once. Exports are parsed with the typed schema of their kind (see
+    `schema.py`), and unchanged exports are loaded from the Arrow IPC cache. Exports that are
+    byte-identical to another export are skipped, unless `skip_duplicate_files` is False.
+    `duplicates` can pass the result of `find_duplicate_raw_files` when it is already known.
+
+    Returns:
+        The combined scouting data, and a report with one row per file (rows, size on disk,
+        whether it came from the cache, load time, content hash and the export it duplicates)
+        to help spot slow, oversized or duplicated exports.
+    """
+    tables, report = _load_raw_scouting_tables(
+        kind, events, max_workers, use_cache, skip_duplicate_files, duplicates
+    )
+    return _to_dataframe(tables), report
+
+
+def get_filtered_path(event: str, kind: str) -> str:
+    return os.path.join("data", event, FILTERED_FOLDER, f"{kind}.parquet")
+
+
+def get_validation_path(event: str) -> str:
+    return os.path.join("data", event, FILTERED_FOLDER, VALIDATION_FILE)
+
+
+def load_validation_report(event: str) -> Optional[dict]:
+    """
+    The quality report of the match scouting of an event (see `validation.build_report`), or
+    None when the ETL has not validated the event yet.
+    """
+    try:
+        with open(get_validation_path(event), "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _drop_duplicate_rows(kind: str, tables: List[pa.Table]) -> List[pa.Table]:
+    """
+    Only keep the first export of every row (see `schema.get_row_keys`), like the ETL does, for
+    the events read from their raw exports.
+    """
+    if not tables:
+        return tables
+    table: pa.Table = pa.concat_tables(tables, promote_options="permissive")
+    key_columns: List[str] = [
+        column for column in ROW_KEY_COLUMNS[kind] if column in table.schema.names
+    ]
+    duplicated: np.ndarray = get_row_keys(to_pandas(table.select(key_columns)), kind).duplicated()
+    return [table.filter(pa.array(~duplicated))]
+
+
+def _scan_scouting_tables(
+    kind: str,
+    events: Optional[List[str]] = None,
+    predicate: Optional[ds.Expression] = None,
+    columns: Optional[List[str]] = None,
+) -> List[pa.Table]:
+    """
+    Read the given events from the filtered store, only materializing the rows matching the
+    predicate and the requested columns. Each event is its own partition, so unselected events
+    are never opened. Events that have not been through the ETL yet fall back to their raw
+    exports, filtered the same way.
+    """
+    tables: List[pa.Table] = []
+    raw_events: List[str] = []
+    for event in events if events is not None else get_events_available():
+        path: str = get_filtered_path(event, kind)
+        if not os.path.exists(path):
+            raw_events.append(event)
+            continue
+
+        dataset = ds.dataset(path, format="parquet")
+        selected_columns: Optional[List[str]] = (
+            [column for column in columns if column in dataset.schema.names] if columns else None
+        )
+        tables.append(dataset.to_table(columns=selected_columns, filter=predicate))
+
+    if raw_events:
+        raw_tables, _ = _load_raw_scouting_tables(kind, events=raw_events)
+        for table in _drop_duplicate_rows(kind, raw_tables):
+            if predicate is not None:
+                table = table.filter(predicate)
+            if columns:
+                table = table.select([column for column in columns if column in table.schema.names])
+            tables.append(table)
+
+    return tables
+
+
+def query_scouting_table(
+    kind: str,
+    events: Optional[List[str]] = None,
+    predicate: Optional[ds.Expression] = None,
+    columns: Optional[List[str]] = None,
+) -> pa.Table:
+    """
+    Same as `query_filtered_scouting_data`, but returns a single Arrow table.
+    """
+    tables: List[pa.Table] = _scan_scouting_tables(kind, events, predicate, columns)
+    if not tables:
+        return pa.table({"source": pa.array([], pa.string()), "event": pa.array([], pa.string())})
+    return pa.concat_tables(tables, promote_options="permissive")
+
+
+def build_scouting_predicate(
+    teams: Optional[List[int]] = None, matches: Optional[List[int]] = None
+) -> Optional[ds.Expression]:
+    """
+    Build the read-time filter for the given team and match numbers, or None to keep every row.
+    """
+    predicate: Optional[ds.Expression] = None
+    for column, values in [("team.number", teams), ("match.number", matches)]:
+        if values:
+            expression: ds.Expression = ds.field(column).isin([int(value) for value in values])
+            predicate = expression if predicate is None else predicate & expression
+    return predicate
+
+
+def query_filtered_scouting_data(kind: str, events: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Read the filtered store built by the ETL for the given kind of scouting. Events that have not
+    been through the ETL yet fall back to their raw exports.
+    """
+    return _to_dataframe(_scan_scouting_tables(kind, events))
+
+
+def query_match_scouting(
+    events: Optional[List[str]] = None,
+    teams: Optional[List[int]] = None,
+    matches: Optional[List[int]] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Query match scouting data, filtering at read time so the amount of data loaded scales with
+    the selection rather than with the whole season.
+
+    Parameters:
+        events (list, optional): Only read these events. Defaults to every event.
+        teams (list, optional): Only keep rows for these team numbers.
+        matches (list, optional): Only keep rows for these match numbers.
+        columns (list, optional): Only load these columns. Defaults to every column.
+    """
+    predicate: Optional[ds.Expression] = build_scouting_predicate(teams, matches)
+    return _to_dataframe(_scan_scouting_tables("match", events, predicate, columns))
+
+
+def query_pit_scouting(
+    events: Optional[List[str]] = None,
+    teams: Optional[List[int]] = None,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Query pit scouting data, filtering at read time like `query_match_scouting`.
+    """
+    predicate: Optional[ds.Expression] = build_scouting_predicate(teams)
+    return _to_dataframe(_scan_scouting_tables("pit", events, predicate, columns))
+
+
 def query_pit_scouting_data_by_event(event: str) -> pd.DataFrame:
-    path: str = os.path.join("data", event, "raw", "pit")
-    
-    csv_files = [file for file in os.listdir(path) if file.endswith('.csv')]
-    dataframe = None
+    return load_raw_scouting_files("pit", events=[event])[0]
+
 
-    for file in csv_files:
-        file_path = os.path.join(path, file)
-        df = pd.read_csv(file_path)
-        df['source'] = os.path.basename(file_path)
-        df['event'] = event
-        dataframe = pd.concat([dataframe, df])
+def load_match_schedule(event: str) -> Optional[pd.DataFrame]:
+    """
+    The qualification schedule of an event, or None when the event has no schedule file.
 
-    return pd.concat([dataframe])
+    The schedule has a `match.number` column, the teams of every alliance in `red.1` to `blue.3`,
+    and the scores of the matches already played in `red.score` and `blue.score` (empty for the
+    matches still to be played).
+    """
+    path: str = os.path.join("data", event, SCHEDULE_FILE)
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, dtype_backend="numpy_nullable").sort_values(by="match.number")
 
 
 def get_events_available() -> List[str]:
-    return os.listdir("data")
+    return sorted(os.listdir("data"))
 
 
 def query_all_pit_scouting_data() -> pd.DataFrame:
-    dataframe = None
-    for event in os.listdir("data"):
-        dataframe = pd.concat([dataframe, query_pit_scouting_data_by_event(event=event)])
-    return dataframe
+    return load_raw_scouting_files("pit")[0]
 
 
 def query_match_scouting_data_by_event(event: str) -> pd.DataFrame:
-    path: str = os.path.join("data", event, "raw", "match")
-    
-    csv_files = [file for file in os.listdir(path) if file.endswith('.csv')]
-    dataframe = None
-
-    for file in csv_files:
-        file_path = os.path.join(path, file)
-        df = pd.read_csv(file_path)
-        df['source'] = os.path.basename(file_path)
-        df['event'] = event
-        dataframe = pd.concat([dataframe, df])
-
-    return pd.concat([dataframe])
+    return load_raw_scouting_files("match", events=[event])[0]
 
 
 def query_all_match_scouting_data() -> pd.DataFrame:
-    dataframe = None
-    for event in os.listdir("data"):
-        event_data = query_match_scouting_data_by_event(event=event)
-        event_data["event"] = event
-        dataframe = pd.concat([dataframe, event_data])
-    return dataframe
+    return load_raw_scouting_files("match")[0]
 
 
 def load_tba_opr_options() -> List[str]:
-    return [file.removesuffix(".json").capitalize() for file in os.listdir(os.path.join("tba_oprs"))]
+    return [event.capitalize() for event in _list_tba_opr_events()]
 
 
-def load_tba_opr_data(event: str) -> pd.DataFrame:
-    path: str = os.path.join("tba_oprs", f"{event.lower()}.json")
+def _list_tba_opr_events() -> List[str]:
+    if not os.path.isdir(TBA_OPR_PATH):
+        return []
+    return sorted(
+        file.removesuffix(".json") for file in os.listdir(TBA_OPR_PATH) if file.endswith(".json")
+    )
+
+
+def get_tba_opr_teams(event: str) -> List[int]:
+    """
+    Teams of an event according to its TBA OPR dump, or no teams when it has none.
+    """
+    if event.lower() not in _list_tba_opr_events():
+        return []
+    return _read_tba_opr_file(event.lower()).index.astype(int).tolist()
 
+
+def _read_tba_opr_file(event: str) -> pd.DataFrame:
+    """
+    Read a TBA OPR dump, which lists `[team, value]` pairs for every metric, into a frame with a
+    column per metric, indexed by integer team numbers.
+    """
+    path: str = os.path.join(TBA_OPR_PATH, f"{event.lower()}.json")
     if not os.path.exists(path):
         raise Exception("Path does not exist for that event.")
-    
-    # Read initial data (the way TBA formatted it)
-    data: dict = {}
-    with open(path, 'r') as file:
-        data = json.load(file)
-
-    # Re-organize the Dictionary to have the team number as the key
-    flattened_data: dict = {}
-    for key, values in data.items():
-        for value in values:
-            if not flattened_data.get(key, None):
-                flattened_data[key] = {}
-            flattened_data[key][value[0]] = value[1]
-
-    df = pd.DataFrame(flattened_data)
-    
-    # The Team Number is the index, we want it explicitly labelled.
-    df["Team Number"] = df.index
-
-    # Make the Team Number the first column in the DF
-    df = df[["Team Number", *df.columns.difference(["Team Number"])]]
-    
-    # Numerically sort by Team Number
-    df["Team Number"] = df["Team Number"].astype(int)
-    df = df.sort_values(by=["Team Number"]).reset_index(drop=True)
-    df["Team Number"] = df["Team Number"].astype(str)
-    
-    return df
\ No newline at end of file
+
+    with open(path, "r") as file:
+        data: Dict[str, list] = json.load(file)
+
+    # pandas aligns the teams of every metric, in case TBA lists them in different orders
+    df = pd.DataFrame({metric: dict(pairs) for metric, pairs in data.items()}, dtype="float64")
+    df.index = df.index.astype(int).rename("team.number")
+    return df
+
+
+def load_tba_oprs(events: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Every TBA OPR dump (or the given events) in a single frame indexed by (event, team.number),
+    with the events in lowercase and a column per metric.
+    """
+    events = _list_tba_opr_events() if events is None else [event.lower() for event in events]
+    if not events:
+        return pd.DataFrame(
+            index=pd.MultiIndex.from_arrays([[], []], names=["event", "team.number"])
+        )
+    return pd.concat(
+        {event: _read_tba_opr_file(event) for event in events}, names=["event", "team.number"]
+    ).sort_index()
+
+
+def rank_tba_oprs(oprs: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Rank every team on every metric within its event, as returned by `load_tba_oprs`.
+
+    Returns:
+        The ranks (1 is the highest value, ties share the best rank) and the percentiles (1.0 is
+        the highest value) of every metric, indexed like `oprs`.
+    """
+    by_event = oprs.groupby(level="event")
+    ranks: pd.DataFrame = by_event.rank(ascending=False, method="min").astype("UInt16")
+    percentiles: pd.DataFrame = by_event.rank(pct=True)
+    return ranks, percentiles
+
+
+def load_tba_opr_data(event: str) -> pd.DataFrame:
+    """
+    The OPRs of a single event, with the integer team number in the first column.
+    """
+    df: pd.DataFrame = _read_tba_opr_file(event).sort_index()
+    return df.rename_axis("Team Number").reset_index()
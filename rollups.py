@@ -0,0 +1,272 @@
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+
+from consensus import DISPUTED_COLUMN, SCOUTS_COLUMN, SPREAD_COLUMN
+
+# Columns identifying a scouted robot or describing how it was scouted, rather than measuring it
+ROLLUP_EXCLUDED_COLUMNS: List[str] = [
+    "team.number",
+    "match.number",
+    "season",
+    SCOUTS_COLUMN,
+    SPREAD_COLUMN,
+    DISPUTED_COLUMN,
+]
+
+# Centroids kept by the quantile sketch of every team. Quantiles are exact until a team has more
+# scouted rows than this at an event.
+SKETCH_SIZE: int = 64
+
+# Quantiles served by `TeamRollup.get_statistic`, by name
+QUANTILES: Dict[str, float] = {"p25": 0.25, "median": 0.5, "p75": 0.75}
+
+# Every statistic of a rollup
+ROLLUP_STATISTICS: List[str] = ["count", "mean", "std", "min", "max", *QUANTILES]
+
+
+def get_rollup_columns(match_data: pd.DataFrame) -> List[str]:
+    """
+    Counters, flags and derived metrics of the match data, which are rolled up per team.
+    """
+    return [
+        column
+        for column, dtype in match_data.dtypes.items()
+        if column not in ROLLUP_EXCLUDED_COLUMNS
+        and not isinstance(dtype, pd.CategoricalDtype)
+        and dtype.kind in "iufb"
+    ]
+
+
+def _compress_sketch(values: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sort the centroids of every metric (column) and, past `SKETCH_SIZE`, merge neighbouring
+    centroids into their weighted mean until it fits. Missing values have no weight and sort last.
+    """
+    order: np.ndarray = np.argsort(np.where(weights > 0, values, np.inf), axis=0, kind="stable")
+    values = np.take_along_axis(values, order, axis=0)
+    weights = np.take_along_axis(weights, order, axis=0)
+
+    while len(values) > SKETCH_SIZE:
+        if len(values) % 2:
+            values = np.vstack([values, np.zeros((1, values.shape[1]))])
+            weights = np.vstack([weights, np.zeros((1, weights.shape[1]))])
+        pair_weights: np.ndarray = weights[0::2] + weights[1::2]
+        pair_sums: np.ndarray = values[0::2] * weights[0::2] + values[1::2] * weights[1::2]
+        values = np.divide(
+            pair_sums, pair_weights, out=np.zeros_like(pair_sums), where=pair_weights > 0
+        )
+        weights = pair_weights
+    return values, weights
+
+
+class TeamRollup:
+    """
+    Rolled up statistics of every team at one event, for every counter and derived metric: the
+    count, mean and variance, the minimum and maximum, and a quantile sketch.
+
+    Means and variances are kept with Welford's algorithm, merging every batch of new rows at
+    once (Chan et al.), so ingesting new exports only touches the new rows. A team whose
+    previously ingested rows changed or disappeared is rebuilt from its current rows. Reading a
+    statistic costs one row per team, however many matches were scouted.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns: List[str] = columns
+        self.teams: List[int] = []
+        self._team_positions: Dict[int, int] = {}
+        shape: Tuple[int, int] = (0, len(columns))
+        self._count: np.ndarray = np.zeros(shape)
+        self._mean: np.ndarray = np.zeros(shape)
+        self._m2: np.ndarray = np.zeros(shape)
+        self._min: np.ndarray = np.full(shape, np.inf)
+        self._max: np.ndarray = np.full(shape, -np.inf)
+        # Centroid values and weights of the quantile sketch of every team
+        self._sketches: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+        # Hashes of the rows ingested for every team, to detect new and changed rows
+        self._row_hashes: Dict[int, Set[int]] = {}
+
+    def _add_teams(self, teams: List[int]) -> None:
+        new_teams: List[int] = [team for team in teams if team not in self._team_positions]
+        if not new_teams:
+            return
+        for team in new_teams:
+            self._team_positions[team] = len(self.teams)
+            self.teams.append(team)
+            self._sketches[team] = (
+                np.zeros((0, len(self.columns))),
+                np.zeros((0, len(self.columns))),
+            )
+            self._row_hashes[team] = set()
+        padding: Tuple[Tuple[int, int], Tuple[int, int]] = ((0, len(new_teams)), (0, 0))
+        self._count = np.pad(self._count, padding)
+        self._mean = np.pad(self._mean, padding)
+        self._m2 = np.pad(self._m2, padding)
+        self._min = np.pad(self._min, padding, constant_values=np.inf)
+        self._max = np.pad(self._max, padding, constant_values=-np.inf)
+
+    def _reset_teams(self, teams: List[int]) -> None:
+        positions: List[int] = [self._team_positions[team] for team in teams]
+        self._count[positions] = 0
+        self._mean[positions] = 0
+        self._m2[positions] = 0
+        self._min[positions] = np.inf
+        self._max[positions] = -np.inf
+        for team in teams:
+            self._sketches[team] = (
+                np.zeros((0, len(self.columns))),
+                np.zeros((0, len(self.columns))),
+            )
+            self._row_hashes[team] = set()
+
+    def _merge(self, team_numbers: np.ndarray, values: np.ndarray) -> None:
+        """
+        Merge rows (with NaN for missing values) into the statistics of their teams.
+        """
+        teams, inverse = np.unique(team_numbers, return_inverse=True)
+        positions: np.ndarray = np.array([self._team_positions[team] for team in teams.tolist()])
+        present: np.ndarray = ~np.isnan(values)
+        filled: np.ndarray = np.where(present, values, 0)
+
+        # Statistics of the batch of every team
+        count: np.ndarray = np.zeros((len(teams), len(self.columns)))
+        total: np.ndarray = np.zeros_like(count)
+        np.add.at(count, inverse, present)
+        np.add.at(total, inverse, filled)
+        mean: np.ndarray = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+        m2: np.ndarray = np.zeros_like(count)
+        np.add.at(m2, inverse, np.where(present, filled - mean[inverse], 0) ** 2)
+        minimum: np.ndarray = np.full_like(count, np.inf)
+        maximum: np.ndarray = np.full_like(count, -np.inf)
+        np.minimum.at(minimum, inverse, np.where(present, values, np.inf))
+        np.maximum.at(maximum, inverse, np.where(present, values, -np.inf))
+
+        # Merge the batch into the running statistics
+        previous_count: np.ndarray = self._count[positions]
+        merged_count: np.ndarray = previous_count + count
+        delta: np.ndarray = mean - self._mean[positions]
+        share: np.ndarray = np.divide(
+            count, merged_count, out=np.zeros_like(count), where=merged_count > 0
+        )
+        self._mean[positions] += delta * share
+        self._m2[positions] += m2 + delta**2 * previous_count * share
+        self._count[positions] = merged_count
+        self._min[positions] = np.minimum(self._min[positions], minimum)
+        self._max[positions] = np.maximum(self._max[positions], maximum)
+
+        for group, team in enumerate(teams.tolist()):
+            rows: np.ndarray = values[inverse == group]
+            sketch_values, sketch_weights = self._sketches[team]
+            self._sketches[team] = _compress_sketch(
+                np.vstack([sketch_values, np.nan_to_num(rows)]),
+                np.vstack([sketch_weights, ~np.isnan(rows)]),
+            )
+
+    def update(self, match_data: pd.DataFrame) -> int:
+        """
+        Ingest the scouted rows of the event. Rows already ingested are skipped, and teams with
+        rows that changed or disappeared since the last update are rebuilt.
+
+        Returns:
+            The number of rows merged.
+        """
+        rows: pd.DataFrame = match_data.dropna(subset=["team.number"])
+        team_numbers: np.ndarray = rows["team.number"].to_numpy(dtype=np.int64)
+        hashes: np.ndarray = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+
+        current: Dict[int, Set[int]] = {}
+        for team, row_hash in zip(team_numbers.tolist(), hashes.tolist()):
+            current.setdefault(team, set()).add(row_hash)
+
+        # Teams that lost rows start over, and every other team only merges its new rows
+        stale_teams: List[int] = [
+            team
+            for team, team_hashes in self._row_hashes.items()
+            if not team_hashes <= current.get(team, set())
+        ]
+        self._reset_teams(stale_teams)
+        self._add_teams(list(current))
+        new_rows: np.ndarray = np.array(
+            [
+                row_hash not in self._row_hashes[team]
+                for team, row_hash in zip(team_numbers.tolist(), hashes.tolist())
+            ],
+            dtype=bool,
+        )
+        if new_rows.any():
+            values: np.ndarray = (
+                rows.loc[new_rows]
+                .reindex(columns=self.columns)
+                .astype(np.float64)
+                .to_numpy(na_value=np.nan)
+            )
+            self._merge(team_numbers[new_rows], values)
+        for team, row_hash in zip(team_numbers[new_rows].tolist(), hashes[new_rows].tolist()):
+            self._row_hashes[team].add(row_hash)
+        return int(new_rows.sum())
+
+    def _get_quantile(self, quantile: float) -> np.ndarray:
+        result: np.ndarray = np.full((len(self.teams), len(self.columns)), np.nan)
+        for position, team in enumerate(self.teams):
+            values, weights = self._sketches[team]
+            if not len(values):
+                continue
+            cumulative: np.ndarray = np.cumsum(weights, axis=0)
+            # First centroid reaching the quantile of the weight of every metric
+            ranks: np.ndarray = (cumulative < quantile * cumulative[-1]).sum(axis=0)
+            ranks = np.minimum(ranks, len(values) - 1)
+            result[position] = np.where(
+                cumulative[-1] > 0,
+                np.take_along_axis(values, ranks[None, :], axis=0)[0],
+                np.nan,
+            )
+        return result
+
+    def get_statistic(self, statistic: str = "mean") -> pd.DataFrame:
+        """
+        One of `ROLLUP_STATISTICS` for every team with scouted rows (row, by team number) and
+        metric (column). Statistics of metrics a team has no values for are NaN, and its count
+        is 0.
+        """
+        count: np.ndarray = self._count
+        empty: np.ndarray = count == 0
+        if statistic == "count":
+            values: np.ndarray = count
+        elif statistic == "mean":
+            values = np.where(empty, np.nan, self._mean)
+        elif statistic == "std":
+            values = np.sqrt(
+                np.divide(self._m2, count - 1, out=np.full_like(count, np.nan), where=count > 1)
+            )
+        elif statistic == "min":
+            values = np.where(empty, np.nan, self._min)
+        elif statistic == "max":
+            values = np.where(empty, np.nan, self._max)
+        elif statistic in QUANTILES:
+            values = self._get_quantile(QUANTILES[statistic])
+        else:
+            raise ValueError(f"Unknown statistic {statistic}, expected one of {ROLLUP_STATISTICS}")
+
+        # Teams whose every row disappeared keep their slot, but have nothing to report
+        scouted: np.ndarray = np.array(
+            [bool(self._row_hashes[team]) for team in self.teams], dtype=bool
+        )
+        rollup = pd.DataFrame(
+            values[scouted],
+            index=pd.Index(np.array(self.teams, dtype=np.int64)[scouted], name="team.number"),
+            columns=self.columns,
+        )
+        return rollup.sort_index()
+
+
+def compute_team_rollup(
+    match_data: pd.DataFrame, columns: Optional[List[str]] = None
+) -> TeamRollup:
+    """
+    Roll up the match data of one event from scratch, over `columns` or every column from
+    `get_rollup_columns`.
+    """
+    rollup = TeamRollup(columns or get_rollup_columns(match_data))
+    rollup.update(match_data)
+    return rollup
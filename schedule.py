@@ -0,0 +1,161 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+
+# Columns of the teams of every alliance in a match schedule, red first
+ALLIANCE_COLUMNS: List[str] = ["red.1", "red.2", "red.3", "blue.1", "blue.2", "blue.3"]
+
+# Number of times the rest of the schedule is simulated for every projection
+SEASON_COUNT: int = 2_000
+
+# Ranking points for winning and tying a qualification match
+WIN_RANKING_POINTS: int = 2
+TIE_RANKING_POINTS: int = 1
+
+
+class ScheduleArrays(NamedTuple):
+    """
+    A match schedule compiled to arrays, with teams replaced by their position in `teams`.
+    """
+
+    teams: np.ndarray
+    # (matches, 6) positions of the teams of every match, red first
+    alliances: np.ndarray
+    # (matches, 2) red and blue scores of the matches already played, NaN for the others
+    scores: np.ndarray
+    # (teams, matches, periods) scouted points of every team, padded with zeros
+    samples: np.ndarray
+    # Number of scouted matches of every team, at least 1 so unscouted teams score 0
+    sample_counts: np.ndarray
+
+
+def compile_schedule(
+    schedule: pd.DataFrame, team_samples: Dict[int, np.ndarray]
+) -> ScheduleArrays:
+    """
+    Compile a schedule (see `query_data.load_match_schedule`) and the scouted points of its teams
+    (see `predictions.get_team_samples`) into the arrays `simulate_seasons` works on.
+    """
+    team_numbers: np.ndarray = schedule[ALLIANCE_COLUMNS].to_numpy(dtype=np.int64)
+    teams, alliances = np.unique(team_numbers, return_inverse=True)
+    alliances = alliances.reshape(team_numbers.shape)
+
+    period_count: int = next((points.shape[1] for points in team_samples.values()), 1)
+    sample_counts: np.ndarray = np.array(
+        [max(len(team_samples.get(int(team), [])), 1) for team in teams]
+    )
+    samples: np.ndarray = np.zeros((len(teams), sample_counts.max(), period_count))
+    for position, team in enumerate(teams.tolist()):
+        if team in team_samples:
+            samples[position, : len(team_samples[team])] = team_samples[team]
+
+    scores: np.ndarray = (
+        schedule.reindex(columns=["red.score", "blue.score"])
+        .astype("Float64")
+        .to_numpy(dtype=np.float64, na_value=np.nan)
+    )
+    return ScheduleArrays(teams, alliances, scores, samples, sample_counts)
+
+
+def simulate_seasons(
+    arrays: ScheduleArrays, season_count: int, seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    Simulate the unplayed matches of the schedule `season_count` times at once and rank the teams
+    at the end of every simulated season.
+
+    Teams are ranked by their average ranking points, then by their average alliance score.
+
+    Returns:
+        A (seasons, teams) array of the rank of every team (0 is first) in every season.
+    """
+    rng = np.random.default_rng(seed)
+    team_count: int = len(arrays.teams)
+    match_count: int = len(arrays.alliances)
+
+    # Draw one scouted match for every robot of every match of every season
+    draws: np.ndarray = (
+        rng.random((season_count, match_count, 6)) * arrays.sample_counts[arrays.alliances]
+    ).astype(np.int64)
+    robot_points: np.ndarray = arrays.samples[arrays.alliances, draws].sum(axis=-1)
+    scores: np.ndarray = np.stack(
+        [robot_points[..., :3].sum(axis=-1), robot_points[..., 3:].sum(axis=-1)], axis=-1
+    )
+
+    # Matches already played keep their actual scores
+    played: np.ndarray = ~np.isnan(arrays.scores).any(axis=1)
+    scores[:, played] = arrays.scores[played]
+
+    red_wins: np.ndarray = scores[..., 0] > scores[..., 1]
+    blue_wins: np.ndarray = scores[..., 1] > scores[..., 0]
+    ties: np.ndarray = ~red_wins & ~blue_wins
+    ranking_points: np.ndarray = (
+        np.stack([red_wins, blue_wins], axis=-1) * WIN_RANKING_POINTS
+        + ties[..., None] * TIE_RANKING_POINTS
+    )
+    slot_ranking_points: np.ndarray = np.repeat(ranking_points, 3, axis=-1)
+    slot_scores: np.ndarray = np.repeat(scores, 3, axis=-1)
+
+    # Sum every slot into its team with one product against the (slots, teams) membership matrix
+    membership: np.ndarray = np.zeros((match_count * 6, team_count))
+    membership[np.arange(match_count * 6), arrays.alliances.ravel()] = 1
+    matches_played: np.ndarray = np.maximum(membership.sum(axis=0), 1)
+    ranking_score: np.ndarray = (
+        slot_ranking_points.reshape(season_count, -1) @ membership / matches_played
+    )
+    average_score: np.ndarray = slot_scores.reshape(season_count, -1) @ membership / matches_played
+
+    order: np.ndarray = np.lexsort((-average_score, -ranking_score), axis=-1)
+    ranks: np.ndarray = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(team_count)[None, :], axis=-1)
+    return ranks
+
+
+def project_rankings(
+    schedule: pd.DataFrame,
+    team_samples: Dict[int, np.ndarray],
+    season_count: int = SEASON_COUNT,
+    max_workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Distribution of the final ranking of every team of the schedule, from simulating its unplayed
+    matches with the scouted points of every team.
+
+    With `max_workers` above 1, the seasons are split between that many processes.
+
+    Returns:
+        The share of the simulated seasons every team (row) finished at every rank (column, 1 is
+        first), sorted by expected rank, with the expected rank in `Expected Rank`.
+    """
+    arrays: ScheduleArrays = compile_schedule(schedule, team_samples)
+    team_count: int = len(arrays.teams)
+
+    # Every process simulates its share of the seasons with its own random stream
+    worker_count: int = max(max_workers or 1, 1)
+    seeds: List[int] = np.random.SeedSequence(seed).generate_state(worker_count).tolist()
+    chunks: List[int] = [
+        len(chunk) for chunk in np.array_split(np.arange(season_count), worker_count)
+    ]
+    if len(seeds) > 1:
+        with ProcessPoolExecutor(max_workers=len(seeds)) as executor:
+            ranks: np.ndarray = np.concatenate(
+                list(executor.map(simulate_seasons, [arrays] * len(seeds), chunks, seeds))
+            )
+    else:
+        ranks = simulate_seasons(arrays, season_count, seeds[0])
+
+    # Count every (team, rank) pair at once
+    counts: np.ndarray = np.bincount(
+        (np.arange(team_count)[None, :] * team_count + ranks).ravel(),
+        minlength=team_count * team_count,
+    ).reshape(team_count, team_count)
+
+    distribution = pd.DataFrame(
+        counts / len(ranks),
+        index=pd.Index(arrays.teams, name="Team Number"),
+        columns=np.arange(1, team_count + 1),
+    )
+    distribution.insert(0, "Expected Rank", ranks.mean(axis=0) + 1)
+    return distribution.sort_values(by="Expected Rank")
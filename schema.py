@@ -0,0 +1,249 @@
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+# Literal values the scouting app writes for missing values and booleans
+NULL_VALUES: List[str] = ["null", ""]
+TRUE_VALUES: List[str] = ["true"]
+FALSE_VALUES: List[str] = ["false"]
+
+# Arrow type each pandas dtype of the schemas below is parsed as
+ARROW_TYPES: Dict[str, pa.DataType] = {
+    "UInt8": pa.uint8(),
+    "UInt16": pa.uint16(),
+    "boolean": pa.bool_(),
+    "float32": pa.float32(),
+    "string": pa.string(),
+    "category": pa.dictionary(pa.int32(), pa.string()),
+    "datetime64[ns]": pa.timestamp("ns"),
+}
+
+# Arrow types that would otherwise become numpy dtypes (losing nulls) or `object` columns
+PANDAS_DTYPES: Dict[pa.DataType, object] = {
+    pa.uint8(): pd.UInt8Dtype(),
+    pa.uint16(): pd.UInt16Dtype(),
+    pa.bool_(): pd.BooleanDtype(),
+    pa.string(): pd.StringDtype(),
+}
+
+# Column listing, for every row, the columns of the export whose values could not be parsed. The
+# scouts hand-edit the exports, so a bad value becomes a missing value instead of failing the
+# whole export, and is reported by the validation instead (see `validation.py`).
+INVALID_VALUES_COLUMN: str = "invalid.values"
+
+# Patterns of the values accepted for the numeric types, before casting them
+INTEGER_PATTERN: str = r"^\d{1,9}$"
+FLOAT_PATTERN: str = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+
+# Every shot counter in the 2024 match scouting export, as `<location>.<outcome>.<period>`
+MATCH_COUNTER_COLUMNS_2024: List[str] = [
+    "amp.completed.auto",
+    "amp.attempted.auto",
+    "subwoofer.completed.auto",
+    "subwoofer.attempted.auto",
+    "podium.completed.auto",
+    "podium.attempted.auto",
+    "midfield.completed.auto",
+    "midfield.attempted.auto",
+    "amp.completed.teleop",
+    "amp.attempted.teleop",
+    "subwoofer.completed.teleop",
+    "subwoofer.attempted.teleop",
+    "podium.completed.teleop",
+    "podium.attempted.teleop",
+    "medium.completed.teleop",
+    "medium.attempted.teleop",
+    "midfield.completed.teleop",
+    "midfield.attempted.teleop",
+]
+
+MATCH_SCHEMA_2024: Dict[str, str] = {
+    "team.number": "UInt16",
+    "match.number": "UInt16",
+    "team.alliance": "category",
+    "initials": "category",
+    "team.present": "boolean",
+    "starting.position": "category",
+    **{column: "UInt8" for column in MATCH_COUNTER_COLUMNS_2024},
+    "coopertition": "boolean",
+    "disabled": "boolean",
+    "location.end": "category",
+    "score.trap.end": "boolean",
+    "high.note.attempt.end": "boolean",
+    "high.note.score.end": "boolean",
+    "summary.end": "string",
+    "timestamp": "datetime64[ns]",
+    "source": "category",
+    "event": "category",
+    "season": "UInt16",
+}
+
+PIT_SCHEMA_2024: Dict[str, str] = {
+    "team.number": "UInt16",
+    "robot.weight": "float32",
+    "robot.travel.height": "float32",
+    "robot.max.height": "float32",
+    "robot.dimensions.length": "float32",
+    "robot.dimensions.width": "float32",
+    "robot.drive.train": "category",
+    "robot.drive.motors": "string",
+    "robot.drive.module": "category",
+    "robot.battery": "string",
+    "robot.intake.method": "string",
+    "robot.climbing.mechanism": "string",
+    "robot.under.stage": "category",
+    "robot.mechanism.motors": "string",
+    "robot.vision.software": "string",
+    "robot.vision.cameras": "string",
+    "robot.auto.software": "string",
+    "other.notes": "string",
+    "timestamp": "datetime64[ns]",
+    "source": "category",
+    "event": "category",
+    "season": "UInt16",
+}
+
+# Every game piece counter of the 2023 match scouting export, as `<period>_<row>_<piece>`
+MATCH_COUNTER_COLUMNS_2023: List[str] = [
+    f"{period}_{row}_{piece}"
+    for period in ["auto", "teleop"]
+    for row in ["high", "mid", "hybrid"]
+    for piece in ["cubes", "cones"]
+]
+
+# The 2023 exports use snake_case column names, see `seasons.py` for how they are normalized
+MATCH_SCHEMA_2023: Dict[str, str] = {
+    "team_number": "UInt16",
+    "match_number": "UInt16",
+    "field_position": "category",
+    **{column: "UInt8" for column in MATCH_COUNTER_COLUMNS_2023},
+    "auto_mobility": "boolean",
+    "auto_dock": "boolean",
+    "auto_balance": "boolean",
+    "teleop_shuttle": "boolean",
+    "teleop_defend": "boolean",
+    "end_park": "boolean",
+    "end_dock": "boolean",
+    "end_balance": "boolean",
+}
+
+PIT_SCHEMA_2023: Dict[str, str] = {
+    "team_number": "UInt16",
+}
+
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    "match": MATCH_SCHEMA_2024,
+    "pit": PIT_SCHEMA_2024,
+}
+
+# Columns identifying a single observation, no matter how many times a tablet exported it
+ROW_KEY_COLUMNS: Dict[str, List[str]] = {
+    "match": ["event", "team.number", "match.number", "initials", "timestamp"],
+    "pit": ["event", "team.number", "timestamp"],
+}
+
+
+def _is_lenient(arrow_type: pa.DataType) -> bool:
+    """
+    Whether a column of this type is read as strings and parsed afterwards, see `_parse_values`.
+    """
+    return (
+        pa.types.is_integer(arrow_type)
+        or pa.types.is_floating(arrow_type)
+        or pa.types.is_boolean(arrow_type)
+    )
+
+
+def _parse_values(
+    values: pa.ChunkedArray, arrow_type: pa.DataType
+) -> Tuple[pa.ChunkedArray, pa.ChunkedArray]:
+    """
+    Parse a column read as strings into its type. Values that are not valid for the type (e.g. a
+    negative or oversized count) become missing.
+
+    Returns:
+        The parsed values, and a mask of the values that could not be parsed.
+    """
+    values = pc.utf8_trim_whitespace(values)
+    if pa.types.is_boolean(arrow_type):
+        valid: pa.ChunkedArray = pc.is_in(values, pa.array(TRUE_VALUES + FALSE_VALUES))
+        parsed: pa.ChunkedArray = pc.is_in(values, pa.array(TRUE_VALUES))
+    elif pa.types.is_integer(arrow_type):
+        valid = pc.match_substring_regex(values, INTEGER_PATTERN)
+        parsed = pc.cast(pc.if_else(valid, values, None), pa.int64())
+        valid = pc.and_(valid, pc.less_equal(parsed, np.iinfo(arrow_type.to_pandas_dtype()).max))
+    else:
+        valid = pc.match_substring_regex(values, FLOAT_PATTERN)
+        parsed = pc.cast(pc.if_else(valid, values, None), pa.float64())
+    parsed = pc.cast(pc.if_else(valid, parsed, None), arrow_type)
+    return parsed, pc.and_(pc.is_valid(values), pc.invert(pc.fill_null(valid, False)))
+
+
+def read_scouting_csv(source, kind: str, schema: Optional[Dict[str, str]] = None) -> pa.Table:
+    """
+    Parse a raw scouting export with the pyarrow CSV reader, using the given schema or the schema
+    of the given kind of scouting ("match" or "pit"). Columns missing from the schema are inferred.
+
+    Numeric and boolean values that do not fit their type are read as missing, and the columns
+    they were in are listed in `INVALID_VALUES_COLUMN`, which is only added when there are any.
+    """
+    schema = SCHEMAS[kind] if schema is None else schema
+    column_types: Dict[str, pa.DataType] = {
+        column: ARROW_TYPES[dtype] for column, dtype in schema.items()
+    }
+    convert_options = pa_csv.ConvertOptions(
+        column_types={
+            column: pa.string() if _is_lenient(arrow_type) else arrow_type
+            for column, arrow_type in column_types.items()
+        },
+        null_values=NULL_VALUES,
+        true_values=TRUE_VALUES,
+        false_values=FALSE_VALUES,
+        strings_can_be_null=True,
+    )
+    table: pa.Table = pa_csv.read_csv(source, convert_options=convert_options)
+
+    # Names of the columns with an invalid value, joined for every row
+    invalid_columns: Optional[pa.ChunkedArray] = None
+    for position, column in enumerate(table.column_names):
+        arrow_type: Optional[pa.DataType] = column_types.get(column)
+        if arrow_type is None or not _is_lenient(arrow_type):
+            continue
+        parsed, invalid = _parse_values(table.column(position), arrow_type)
+        table = table.set_column(position, column, parsed)
+        if not pc.any(invalid).as_py():
+            continue
+        names: pa.ChunkedArray = pc.if_else(invalid, column, None)
+        invalid_columns = (
+            names
+            if invalid_columns is None
+            else pc.coalesce(
+                pc.binary_join_element_wise(invalid_columns, names, ", "), invalid_columns, names
+            )
+        )
+
+    if invalid_columns is not None:
+        table = table.append_column(INVALID_VALUES_COLUMN, invalid_columns)
+    return table
+
+
+def get_row_keys(df: pd.DataFrame, kind: str) -> pd.Index:
+    """
+    Hash the key columns of every row into a single 64-bit key, so that observations can be
+    deduplicated or looked up with a hash index instead of comparing every key column. Key
+    columns a season does not export are left out.
+    """
+    columns: List[str] = [column for column in ROW_KEY_COLUMNS[kind] if column in df.columns]
+    return pd.Index(pd.util.hash_pandas_object(df[columns], index=False))
+
+
+def to_pandas(table: pa.Table) -> pd.DataFrame:
+    """
+    Convert scouting data parsed by `read_scouting_csv` to pandas, keeping nullable integers
+    and booleans, and turning dictionary encoded columns into categoricals.
+    """
+    return table.to_pandas(types_mapper=PANDAS_DTYPES.get)
+
@@ -0,0 +1,146 @@
+from enum import Enum
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+
+from scoring_guide import ChargedUpScore, Score
+
+# Periods points are scored in, in the order of the point columns
+SCORING_PERIODS: List[str] = ["auto", "teleop", "endgame"]
+
+
+class ScoringTerm(NamedTuple):
+    """
+    Points scored by a robot for one scouted column during a period of the match.
+
+    Counters score `score` points per unit. When `value` is set, the column is categorical and
+    scores `score` points once when it equals `value`. Boolean columns score when true.
+    """
+
+    column: str
+    period: str
+    score: Enum
+    value: Optional[str] = None
+
+
+# Shots from every location but the amp go into the speaker. The scouting app does not record
+# whether the speaker was amplified, so every speaker note is scored as unamplified.
+SCORING_TERMS: List[ScoringTerm] = [
+    ScoringTerm("amp.completed.auto", "auto", Score.AUTO_AMP),
+    ScoringTerm("subwoofer.completed.auto", "auto", Score.AUTO_SPEAKER),
+    ScoringTerm("podium.completed.auto", "auto", Score.AUTO_SPEAKER),
+    ScoringTerm("midfield.completed.auto", "auto", Score.AUTO_SPEAKER),
+    ScoringTerm("amp.completed.teleop", "teleop", Score.TELEOP_AMP),
+    ScoringTerm("subwoofer.completed.teleop", "teleop", Score.TELEOP_SPEAKER),
+    ScoringTerm("podium.completed.teleop", "teleop", Score.TELEOP_SPEAKER),
+    ScoringTerm("medium.completed.teleop", "teleop", Score.TELEOP_SPEAKER),
+    ScoringTerm("midfield.completed.teleop", "teleop", Score.TELEOP_SPEAKER),
+    ScoringTerm("location.end", "endgame", Score.ENDGAME_PARK, "Parked at Podium"),
+    ScoringTerm("location.end", "endgame", Score.ENDGAME_ONSTAGE, "Climbed from AMP Side"),
+    ScoringTerm("location.end", "endgame", Score.ENDGAME_ONSTAGE, "Climbed from Human Player Side"),
+    ScoringTerm("location.end", "endgame", Score.ENDGAME_ONSTAGE, "Climbed from Center Side"),
+    ScoringTerm("score.trap.end", "endgame", Score.ENDGAME_TRAP),
+]
+
+# Terms of the 2023 game, in the column names `seasons.py` normalizes the 2023 exports to
+SCORING_TERMS_2023: List[ScoringTerm] = [
+    ScoringTerm(
+        f"{row}.{piece}.{period}", period, ChargedUpScore[f"{period.upper()}_{row.upper()}"]
+    )
+    for period in ["auto", "teleop"]
+    for row in ["high", "mid", "hybrid"]
+    for piece in ["cubes", "cones"]
+] + [
+    ScoringTerm("mobility.auto", "auto", ChargedUpScore.AUTO_MOBILITY),
+    ScoringTerm("dock.auto", "auto", ChargedUpScore.AUTO_DOCKED),
+    ScoringTerm("balance.auto", "auto", ChargedUpScore.AUTO_ENGAGED),
+    ScoringTerm("park.end", "endgame", ChargedUpScore.ENDGAME_PARK),
+    ScoringTerm("dock.end", "endgame", ChargedUpScore.ENDGAME_DOCKED),
+    ScoringTerm("balance.end", "endgame", ChargedUpScore.ENDGAME_ENGAGED),
+]
+
+
+def get_points_column(period: str) -> str:
+    return f"{period}.points"
+
+
+def get_scoring_weights(terms: List[ScoringTerm] = SCORING_TERMS) -> np.ndarray:
+    """
+    Points of every term in every period, as a (terms, periods) matrix.
+    """
+    weights: np.ndarray = np.zeros((len(terms), len(SCORING_PERIODS)))
+    for row, term in enumerate(terms):
+        weights[row, SCORING_PERIODS.index(term.period)] = term.score.value
+    return weights
+
+
+def get_scoring_features(
+    match_data: pd.DataFrame, terms: List[ScoringTerm] = SCORING_TERMS
+) -> np.ndarray:
+    """
+    Value of every term in every row, as a (rows, terms) matrix. Missing values count as 0.
+    """
+    features: np.ndarray = np.zeros((len(match_data), len(terms)))
+
+    counters: List[int] = [row for row, term in enumerate(terms) if term.value is None]
+    features[:, counters] = match_data.reindex(
+        columns=[terms[row].column for row in counters]
+    ).to_numpy(dtype=np.float64, na_value=0)
+
+    # Each categorical column is compared with every value it scores for at once
+    categorical_terms: Dict[str, List[int]] = {}
+    for row, term in enumerate(terms):
+        if term.value is not None:
+            categorical_terms.setdefault(term.column, []).append(row)
+    for column, rows in categorical_terms.items():
+        if column not in match_data.columns:
+            continue
+        scored_values: np.ndarray = np.array([terms[row].value for row in rows], dtype=object)
+        values: pd.Series = match_data[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Compare the categories only, then look up every row by its code. Missing values
+            # have code -1, which picks the extra row of zeros.
+            matches: np.ndarray = np.vstack(
+                [
+                    values.cat.categories.to_numpy(dtype=object)[:, None] == scored_values,
+                    np.zeros((1, len(rows)), dtype=bool),
+                ]
+            )
+            features[:, rows] = matches[values.cat.codes.to_numpy()]
+        else:
+            features[:, rows] = values.to_numpy(dtype=object)[:, None] == scored_values
+
+    return features
+
+
+def compute_match_points(
+    match_data: pd.DataFrame, terms: List[ScoringTerm] = SCORING_TERMS
+) -> pd.DataFrame:
+    """
+    Points scored by every row in each period and in total, as one product of the
+    (rows, terms) feature matrix with the (terms, periods) weight matrix.
+
+    Returns:
+        `auto.points`, `teleop.points`, `endgame.points` and `total.points`, aligned with
+        `match_data`.
+    """
+    points: np.ndarray = get_scoring_features(match_data, terms) @ get_scoring_weights(terms)
+
+    points_data = pd.DataFrame(
+        points,
+        index=match_data.index,
+        columns=[get_points_column(period) for period in SCORING_PERIODS],
+    )
+    points_data[get_points_column("total")] = points.sum(axis=1)
+    return points_data
+
+
+def add_match_points(
+    match_data: pd.DataFrame, terms: List[ScoringTerm] = SCORING_TERMS
+) -> pd.DataFrame:
+    """
+    Add the points of every period to `match_data`, replacing points already in it.
+    """
+    points_data: pd.DataFrame = compute_match_points(match_data, terms)
+    match_data = match_data.drop(columns=points_data.columns, errors="ignore")
+    return pd.concat([match_data, points_data], axis=1)
@@ -2,11 +2,32 @@ from enum import Enum
 
 class Score(Enum):
     AUTO_SPEAKER = 5
-    AUTO_AMP = 5
+    AUTO_AMP = 2
     AUTO_MOBILITY = 2
 
     TELEOP_SPEAKER = 2
     TELEOP_AMP = 1
     
     TELEOP_SPEAKER_AMPLIFICATION = 5
-    TELEOP_AMP_AMPLIFICATION = 2
\ No newline at end of file
+    TELEOP_AMP_AMPLIFICATION = 2
+
+    ENDGAME_PARK = 1
+    ENDGAME_ONSTAGE = 3
+    ENDGAME_TRAP = 5
+
+
+class ChargedUpScore(Enum):
+    AUTO_HIGH = 6
+    AUTO_MID = 4
+    AUTO_HYBRID = 3
+    AUTO_MOBILITY = 3
+    AUTO_DOCKED = 8
+    AUTO_ENGAGED = 12
+
+    TELEOP_HIGH = 5
+    TELEOP_MID = 3
+    TELEOP_HYBRID = 2
+
+    ENDGAME_PARK = 2
+    ENDGAME_DOCKED = 6
+    ENDGAME_ENGAGED = 10
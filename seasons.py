@@ -0,0 +1,134 @@
+import csv
+import io
+from typing import Callable, Dict, List, NamedTuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from metrics import SHOOTING_METRICS, ShootingMetric, add_shooting_averages
+from schema import (
+    MATCH_SCHEMA_2023,
+    PIT_SCHEMA_2023,
+    SCHEMAS,
+    read_scouting_csv,
+)
+from scoring import SCORING_TERMS, SCORING_TERMS_2023, ScoringTerm, add_match_points
+
+# Columns added to every export when it is read, instead of trusting the export
+ADDED_COLUMNS: List[str] = ["source", "event", "season"]
+
+
+def _normalize_snake_case_column(column: str) -> str:
+    """
+    Turn a 2023 column name into the dotted form of the 2024 exports, with the period last,
+    e.g. `auto_high_cubes` becomes `high.cubes.auto` and `team_number` becomes `team.number`.
+    """
+    words: List[str] = column.split("_")
+    if words[0] in ["auto", "teleop", "end"]:
+        words = words[1:] + words[:1]
+    return ".".join(words)
+
+
+class SeasonProfile(NamedTuple):
+    """
+    Everything that changes with the game of a season: the schema of its exports, how its column
+    names map to the normalized ones every page reads, its derived metrics and its point values.
+    Supporting a new season only takes a new profile in `SEASONS`.
+    """
+
+    year: int
+    name: str
+    # Export schemas by kind of scouting, with the column names of the export
+    schemas: Dict[str, Dict[str, str]]
+    normalize_column: Callable[[str], str]
+    shooting_metrics: List[ShootingMetric]
+    scoring_terms: List[ScoringTerm]
+
+    def read_export(self, content: bytes, kind: str) -> pa.Table:
+        """
+        Parse a raw export of this season and rename its columns to their normalized names.
+        """
+        table: pa.Table = read_scouting_csv(io.BytesIO(content), kind, self.schemas[kind])
+        table = table.rename_columns([self.normalize_column(name) for name in table.column_names])
+        table = table.drop([name for name in table.column_names if name in ADDED_COLUMNS])
+        return table.append_column(
+            "season", pa.array([self.year] * table.num_rows, pa.uint16())
+        )
+
+    def add_derived_metrics(self, match_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add the shooting averages and the points of every row, replacing the ones already there.
+        """
+        if self.shooting_metrics:
+            match_data = add_shooting_averages(match_data, self.shooting_metrics)
+        return add_match_points(match_data, self.scoring_terms)
+
+
+SEASONS: Dict[int, SeasonProfile] = {
+    profile.year: profile
+    for profile in [
+        SeasonProfile(
+            year=2023,
+            name="Charged Up",
+            schemas={"match": MATCH_SCHEMA_2023, "pit": PIT_SCHEMA_2023},
+            normalize_column=_normalize_snake_case_column,
+            shooting_metrics=[],
+            scoring_terms=SCORING_TERMS_2023,
+        ),
+        SeasonProfile(
+            year=2024,
+            name="Crescendo",
+            schemas=SCHEMAS,
+            normalize_column=str,
+            shooting_metrics=SHOOTING_METRICS,
+            scoring_terms=SCORING_TERMS,
+        ),
+    ]
+}
+
+# Season assumed for data that does not say which season it is from
+CURRENT_SEASON: int = 2024
+
+
+def detect_season(content: bytes, kind: str) -> SeasonProfile:
+    """
+    The season whose schema shares the most columns with the header of a raw export.
+    """
+    header_line: str = content.split(b"\n", 1)[0].decode("utf-8-sig")
+    header: set = set(next(csv.reader([header_line]), []))
+    return max(
+        SEASONS.values(),
+        key=lambda profile: (
+            len(header & set(profile.schemas[kind])),
+            profile.year == CURRENT_SEASON,
+        ),
+    )
+
+
+def read_season_export(content: bytes, kind: str) -> pa.Table:
+    """
+    Parse a raw export of any season into the normalized columns, tagged with its season.
+    """
+    return detect_season(content, kind).read_export(content, kind)
+
+
+def add_derived_metrics(match_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the derived metrics of its season to every row of `match_data`. Rows of different seasons
+    get the metrics of their own season, and the metrics of other seasons are left missing.
+    """
+    seasons: pd.Series = (
+        match_data["season"].fillna(CURRENT_SEASON)
+        if "season" in match_data.columns
+        else pd.Series(CURRENT_SEASON, index=match_data.index)
+    )
+    years: List[int] = seasons.unique().tolist()
+    if len(years) <= 1:
+        return SEASONS[years[0] if years else CURRENT_SEASON].add_derived_metrics(match_data)
+
+    positions: List[np.ndarray] = [np.flatnonzero(seasons == year) for year in years]
+    parts: List[pd.DataFrame] = [
+        SEASONS[year].add_derived_metrics(match_data.iloc[rows])
+        for year, rows in zip(years, positions)
+    ]
+    return pd.concat(parts).iloc[np.argsort(np.concatenate(positions), kind="stable")]
@@ -0,0 +1,128 @@
+from typing import List
+import numpy as np
+import pandas as pd
+
+from scoring import SCORING_PERIODS, get_points_column
+
+# Metrics followed across the season, for every match of every team
+HISTORY_METRICS: List[str] = [get_points_column(period) for period in [*SCORING_PERIODS, "total"]]
+
+# Matches in the rolling windows of the history, i.e. the "last N matches" of a team
+ROLLING_WINDOW: int = 5
+
+# Columns of every match in the history, besides the metrics and their rolling statistics
+HISTORY_KEY_COLUMNS: List[str] = ["team.number", "event", "match.number", "timestamp"]
+
+
+def get_rolling_column(metric: str) -> str:
+    return f"{metric}.rolling"
+
+
+def get_trend_column(metric: str) -> str:
+    return f"{metric}.trend"
+
+
+def _rolling_sums(values: np.ndarray, starts: np.ndarray, window: int) -> np.ndarray:
+    """
+    Sum of every (rows, columns) value with the values before it in the last `window` rows of
+    its group, where `starts` holds the first row of the group of every row.
+    """
+    cumulative: np.ndarray = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+    rows: np.ndarray = np.arange(len(values))
+    window_starts: np.ndarray = np.maximum(rows - window + 1, starts)
+    return cumulative[rows + 1] - cumulative[window_starts]
+
+
+class TeamHistory:
+    """
+    The matches of every team across every event, in the order they were played, with the
+    rolling average and trend of every metric over the last `ROLLING_WINDOW` matches.
+
+    The history is built once when the data is loaded: rows are sorted by team then timestamp,
+    and the rolling statistics of every team are computed at once from cumulative sums over the
+    sorted rows. Looking up a team is then a binary search for its slice.
+    """
+
+    def __init__(self, match_data: pd.DataFrame, window: int = ROLLING_WINDOW):
+        """
+        Args:
+            match_data: Match data of every event, with the derived metrics (see
+                `seasons.add_derived_metrics`).
+        """
+        self.window: int = window
+        self.metrics: List[str] = [
+            metric for metric in HISTORY_METRICS if metric in match_data.columns
+        ]
+
+        # A robot scouted more than once in a match counts once, with its average
+        rows: pd.DataFrame = match_data.dropna(subset=["team.number", "match.number"])
+        matches: pd.DataFrame = (
+            rows.reindex(columns=[*HISTORY_KEY_COLUMNS, *self.metrics])
+            .astype({"event": "string", **{metric: np.float64 for metric in self.metrics}})
+            .groupby(["team.number", "event", "match.number"], sort=False, observed=True)
+            .agg({"timestamp": "min", **{metric: "mean" for metric in self.metrics}})
+            .reset_index()
+            .sort_values(by=["team.number", "timestamp", "event", "match.number"])
+            .reset_index(drop=True)
+        )
+
+        teams: np.ndarray = matches["team.number"].to_numpy(dtype=np.int64)
+        self.teams, self._offsets = np.unique(teams, return_index=True)
+        self._offsets = np.append(self._offsets, len(teams))
+
+        # First row of the team of every row, and position of every row within its team
+        starts: np.ndarray = np.repeat(self._offsets[:-1], np.diff(self._offsets))
+        sequence: np.ndarray = (np.arange(len(teams)) - starts).astype(np.float64)
+        matches.insert(1, "sequence", sequence.astype(np.int64) + 1)
+
+        # Rolling mean and least squares slope (per match) of every metric over the window
+        values: np.ndarray = matches[self.metrics].to_numpy(dtype=np.float64, na_value=0)
+        x: np.ndarray = sequence[:, None]
+        count: np.ndarray = _rolling_sums(np.ones_like(x), starts, window)
+        sum_x: np.ndarray = _rolling_sums(x, starts, window)
+        sum_xx: np.ndarray = _rolling_sums(x**2, starts, window)
+        sum_y: np.ndarray = _rolling_sums(values, starts, window)
+        sum_xy: np.ndarray = _rolling_sums(x * values, starts, window)
+        spread: np.ndarray = count * sum_xx - sum_x**2
+        slopes: np.ndarray = np.divide(
+            count * sum_xy - sum_x * sum_y,
+            spread,
+            out=np.zeros_like(sum_xy),
+            where=spread > 0,
+        )
+        for position, metric in enumerate(self.metrics):
+            matches[get_rolling_column(metric)] = sum_y[:, position] / count[:, 0]
+            matches[get_trend_column(metric)] = slopes[:, position]
+
+        self.history: pd.DataFrame = matches
+
+    def get_team_history(self, team: int) -> pd.DataFrame:
+        """
+        Every match of a team across the season, in the order they were played, with the rolling
+        average and trend of every metric as of that match.
+        """
+        position: int = int(np.searchsorted(self.teams, team))
+        if position == len(self.teams) or self.teams[position] != team:
+            return self.history.iloc[0:0].copy()
+        start, end = self._offsets[position], self._offsets[position + 1]
+        return self.history.iloc[start:end].reset_index(drop=True)
+
+    def get_form(self) -> pd.DataFrame:
+        """
+        Current form of every team, indexed by team number: the number of matches and events it
+        played, and the rolling average and trend of every metric as of its last match.
+        """
+        last: pd.DataFrame = self.history.iloc[self._offsets[1:] - 1]
+        columns: List[str] = [
+            column
+            for metric in self.metrics
+            for column in [get_rolling_column(metric), get_trend_column(metric)]
+        ]
+        form: pd.DataFrame = last.set_index("team.number")[columns]
+        form.insert(0, "matches", np.diff(self._offsets))
+        form.insert(
+            1,
+            "events",
+            self.history.groupby("team.number", sort=True)["event"].nunique().to_numpy(),
+        )
+        return form
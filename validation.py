@@ -0,0 +1,234 @@
+from typing import Callable, Dict, List, NamedTuple, Optional
+import numpy as np
+import pandas as pd
+
+from schema import INVALID_VALUES_COLUMN, get_row_keys
+
+# Highest match number of an event. Qualification schedules never come close to it.
+MAX_MATCH_NUMBER: int = 150
+
+# Column with the raw export every row comes from, and with the scout of every row
+SOURCE_COLUMN: str = "source"
+SCOUT_COLUMN: str = "initials"
+
+
+class ValidationContext(NamedTuple):
+    """
+    What the rows of an event are checked against, besides themselves.
+    """
+
+    # Teams known to be at the event, from its pit scouting and its TBA team list. None when the
+    # event has neither, so the teams cannot be checked.
+    known_teams: Optional[np.ndarray]
+
+
+class ValidationRule(NamedTuple):
+    """
+    A check run over every row of an event at once, returning a mask of the rows failing it.
+    """
+
+    name: str
+    description: str
+    check: Callable[[pd.DataFrame, ValidationContext], np.ndarray]
+    # Whether a row can be checked on its own. The results of those rules are kept for every raw
+    # export, so the rows of unchanged exports are never checked again.
+    row_local: bool
+
+
+def _check_missing_keys(match_data: pd.DataFrame, context: ValidationContext) -> np.ndarray:
+    return match_data.reindex(columns=["team.number", "match.number"]).isna().any(axis=1).to_numpy()
+
+
+def _check_invalid_values(match_data: pd.DataFrame, context: ValidationContext) -> np.ndarray:
+    invalid: pd.Series = match_data.reindex(columns=[INVALID_VALUES_COLUMN])[INVALID_VALUES_COLUMN]
+    return invalid.notna().to_numpy(dtype=bool)
+
+
+def _check_absent_scoring(match_data: pd.DataFrame, context: ValidationContext) -> np.ndarray:
+    counters: List[str] = [
+        column
+        for column, dtype in match_data.dtypes.items()
+        if ".completed." in column and dtype.kind in "iu"
+    ]
+    scored: np.ndarray = match_data[counters].fillna(0).to_numpy(dtype=np.int64).sum(axis=1) > 0
+    present: pd.Series = match_data.reindex(columns=["team.present"])["team.present"]
+    return present.astype("boolean").eq(False).fillna(False).to_numpy(dtype=bool) & scored
+
+
+def _check_match_number(match_data: pd.DataFrame, context: ValidationContext) -> np.ndarray:
+    matches: pd.Series = match_data.reindex(columns=["match.number"])["match.number"]
+    return ((matches < 1) | (matches > MAX_MATCH_NUMBER)).fillna(False).to_numpy(dtype=bool)
+
+
+def _check_unknown_team(match_data: pd.DataFrame, context: ValidationContext) -> np.ndarray:
+    if context.known_teams is None:
+        return np.zeros(len(match_data), dtype=bool)
+    teams: pd.Series = match_data.reindex(columns=["team.number"])["team.number"]
+    return (teams.notna() & ~teams.isin(context.known_teams)).to_numpy(dtype=bool)
+
+
+def _check_both_alliances(match_data: pd.DataFrame, context: ValidationContext) -> np.ndarray:
+    by: List[str] = ["event", "match.number", "team.number"]
+    keys: pd.DataFrame = match_data.reindex(columns=[*by, "team.alliance"]).astype(object)
+    alliances: pd.Series = keys.groupby(by, dropna=False)["team.alliance"].transform("nunique")
+    return (alliances > 1).to_numpy(dtype=bool)
+
+
+# Every check of the match scouting
+MATCH_RULES: List[ValidationRule] = [
+    ValidationRule(
+        "missing.keys",
+        "The team number or the match number is missing.",
+        _check_missing_keys,
+        row_local=True,
+    ),
+    ValidationRule(
+        "invalid.values",
+        "A count, a measurement or a yes/no answer could not be read and was left out.",
+        _check_invalid_values,
+        row_local=True,
+    ),
+    ValidationRule(
+        "absent.scoring",
+        "The team was marked as not present, but scored notes.",
+        _check_absent_scoring,
+        row_local=True,
+    ),
+    ValidationRule(
+        "match.number.range",
+        f"The match number is outside 1 to {MAX_MATCH_NUMBER}.",
+        _check_match_number,
+        row_local=True,
+    ),
+    ValidationRule(
+        "unknown.team",
+        "The team is neither in the pit scouting nor in the TBA team list of the event.",
+        _check_unknown_team,
+        row_local=False,
+    ),
+    ValidationRule(
+        "both.alliances",
+        "The team is listed on both alliances of the same match.",
+        _check_both_alliances,
+        row_local=False,
+    ),
+]
+
+
+def get_rules_key(rules: List[ValidationRule], version: int = 0) -> list:
+    """
+    What the results kept in a report depend on besides the exports: the rules and the version
+    of the code that checked them (e.g. `etl.ETL_VERSION`). Kept as lists, so it compares equal
+    to itself once read back from JSON.
+    """
+    return [version, [[rule.name, rule.description, rule.row_local] for rule in rules]]
+
+
+def validate(
+    match_data: pd.DataFrame,
+    context: ValidationContext,
+    rules: List[ValidationRule] = MATCH_RULES,
+    previous_files: Optional[Dict[str, dict]] = None,
+    signatures: Optional[Dict[str, list]] = None,
+    previous_key: Optional[list] = None,
+    version: int = 0,
+) -> pd.DataFrame:
+    """
+    Run every rule over every row of an event at once.
+
+    The row-local rules are only run on the rows of exports that are new or changed since
+    `previous_files` (the `files` of the last report, see `build_report`), as told by the
+    `signatures` of the exports. The other rows take the results kept in the report, unless the
+    report was built with other rules or another version (its `key`, see `get_rules_key`).
+
+    Returns:
+        One boolean column per rule, True for the rows failing it, aligned with `match_data`.
+    """
+    if previous_key != get_rules_key(rules, version):
+        previous_files = None
+    sources: pd.Series = match_data.reindex(columns=[SOURCE_COLUMN])[SOURCE_COLUMN].astype(object)
+    unchanged: List[str] = [
+        source
+        for source, entry in (previous_files or {}).items()
+        if signatures is not None and entry.get("signature") == signatures.get(source)
+    ]
+    checked: np.ndarray = ~sources.isin(unchanged).to_numpy()
+    row_keys: np.ndarray = get_row_keys(match_data, "match").to_numpy()
+
+    issues = pd.DataFrame(index=match_data.index)
+    for rule in rules:
+        if not rule.row_local or checked.all():
+            issues[rule.name] = rule.check(match_data, context)
+            continue
+
+        failed: np.ndarray = np.zeros(len(match_data), dtype=bool)
+        if checked.any():
+            failed[checked] = rule.check(match_data[checked], context)
+        flagged: List[int] = [
+            key
+            for source in unchanged
+            for key in previous_files[source].get("flagged", {}).get(rule.name, [])
+        ]
+        failed[~checked] = np.isin(row_keys[~checked], np.array(flagged, dtype=row_keys.dtype))
+        issues[rule.name] = failed
+    return issues
+
+
+def _count_issues(issues: pd.DataFrame, groups: pd.Series) -> Dict[str, dict]:
+    counts: pd.DataFrame = issues.astype(np.int64).groupby(groups.to_numpy()).sum()
+    rows: pd.Series = groups.value_counts()
+    return {
+        str(group): {
+            "rows": int(rows[group]),
+            "issues": {rule: int(count) for rule, count in counts.loc[group].items() if count},
+        }
+        for group in counts.index
+    }
+
+
+def build_report(
+    match_data: pd.DataFrame,
+    issues: pd.DataFrame,
+    rules: List[ValidationRule] = MATCH_RULES,
+    signatures: Optional[Dict[str, list]] = None,
+    version: int = 0,
+) -> dict:
+    """
+    Compact quality report of an event from the results of `validate`: the number of rows and
+    of issues of every raw export (`files`) and of every scout (`scouts`), and the rows with
+    issues (`rows`). Every export also keeps its signature and the row keys failing its
+    row-local rules, and the report keeps the rules and version they were checked with
+    (`key`), to validate the next exports incrementally.
+    """
+    sources: pd.Series = match_data.reindex(columns=[SOURCE_COLUMN])[SOURCE_COLUMN]
+    sources = sources.astype("string").fillna("")
+    scouts: pd.Series = match_data.reindex(columns=[SCOUT_COLUMN])[SCOUT_COLUMN]
+    scouts = scouts.astype("string").fillna("")
+
+    files: Dict[str, dict] = _count_issues(issues, sources)
+    row_keys: np.ndarray = get_row_keys(match_data, "match").to_numpy()
+    for source, entry in files.items():
+        in_file: np.ndarray = (sources == source).to_numpy()
+        entry["signature"] = (signatures or {}).get(source)
+        entry["flagged"] = {
+            rule.name: row_keys[in_file & issues[rule.name].to_numpy()].tolist()
+            for rule in rules
+            if rule.row_local and issues[rule.name].to_numpy()[in_file].any()
+        }
+
+    failing: np.ndarray = issues.to_numpy().any(axis=1)
+    rows: pd.DataFrame = match_data.loc[failing].reindex(
+        columns=["match.number", "team.number", SCOUT_COLUMN, SOURCE_COLUMN, INVALID_VALUES_COLUMN]
+    )
+    rows = rows.astype({"match.number": "Int64", "team.number": "Int64"}).astype(object)
+    rows["rules"] = [
+        [rule.name for rule, failed in zip(rules, row) if failed]
+        for row in issues.loc[failing].to_numpy()
+    ]
+    return {
+        "rules": {rule.name: rule.description for rule in rules},
+        "key": get_rules_key(rules, version),
+        "files": files,
+        "scouts": _count_issues(issues, scouts),
+        "rows": rows.where(rows.notna(), None).to_dict(orient="records"),
+    }